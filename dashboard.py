@@ -14,9 +14,8 @@ Or with virtual environment:
 
 import streamlit as st
 import sqlite3
-import pandas as pd
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+import orjson
 from pathlib import Path
 
 # Page configuration
@@ -31,107 +30,188 @@ st.set_page_config(
 DB_PATH = Path(__file__).parent / "database" / "orders.db"
 MENU_PATH = Path(__file__).parent / "database" / "food_menu.json"
 
+# Leading order columns in the joined get_order_details() result
+N_ORDER_COLS = 5
+
+# Table column configs (built once, shared by every rerun)
+ORDERS_COLCFG = {
+    "order_id": st.column_config.TextColumn("Order ID", width="medium"),
+    "customer_name": st.column_config.TextColumn("Customer", width="medium"),
+    "total_amount": st.column_config.NumberColumn(
+        "Total",
+        format="$%.2f",
+        width="small"
+    ),
+    "created_at": st.column_config.TextColumn("Date", width="medium"),
+    "status": st.column_config.TextColumn("Status", width="small")
+}
+
+MENU_COLCFG = {
+    "name": st.column_config.TextColumn(
+        "Item Name",
+        width="large",
+        help="Name of the menu item"
+    ),
+    "category": st.column_config.TextColumn(
+        "Category",
+        width="medium",
+        help="Item category"
+    ),
+    "price": st.column_config.NumberColumn(
+        "Price",
+        format="$%.2f",
+        width="small",
+        help="Price in USD"
+    )
+}
+
+TOP_ITEMS_COLCFG = {
+    "item_name": "Item",
+    "total_quantity": "Quantity Sold",
+    "order_count": "# Orders"
+}
+
+
+@st.cache_resource
+def get_conn():
+    """Shared long-lived read connection (keeps SQLite's page cache warm)"""
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+@st.cache_resource
+def _schema_state():
+    """Process-wide flag; module globals are reset on every Streamlit rerun"""
+    return {"ready": False}
+
+
+def _ensure_schema(conn):
+    """
+    Add the dashboard's derived column and the indexes backing its queries
+
+    Retried on each call until it succeeds, since the agent may create the
+    orders DB after the dashboard has started.
+    """
+    state = _schema_state()
+    if state["ready"]:
+        return
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(orders)")}
+        if not columns:
+            # Tables are created by the agent; nothing to migrate yet
+            return
+        if "created_date" not in columns:
+            conn.execute(
+                "ALTER TABLE orders ADD COLUMN created_date TEXT "
+                "GENERATED ALWAYS AS (date(created_at)) VIRTUAL"
+            )
+        conn.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(created_date);
+            CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_items_name ON order_items(item_name);
+            CREATE INDEX IF NOT EXISTS idx_items_order ON order_items(order_id);
+            """
+        )
+        state["ready"] = True
+    except sqlite3.OperationalError:
+        # Tables are created by the agent; nothing to index yet
+        pass
+
 
 @st.cache_data(ttl=5)  # Cache for 5 seconds
 def get_all_orders():
     """Fetch all orders from database"""
-    conn = sqlite3.connect(str(DB_PATH))
+    import pandas as pd
+
+    conn = get_conn()
     query = """
         SELECT order_id, customer_name,
                total_amount, created_at, status
         FROM orders
         ORDER BY created_at DESC
     """
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    df = pd.read_sql_query(query, conn, dtype_backend="pyarrow")
     return df
 
 
 @st.cache_data(ttl=5)
 def get_order_details(order_id):
     """Fetch detailed information for a specific order"""
-    conn = sqlite3.connect(str(DB_PATH))
+    import pandas as pd
 
-    # Get order info
-    order_query = """
-        SELECT * FROM orders WHERE order_id = ?
-    """
-    order_df = pd.read_sql_query(order_query, conn, params=(order_id,))
+    conn = get_conn()
 
-    # Get order items
-    items_query = """
-        SELECT item_name, quantity, item_price, addons
-        FROM order_items
-        WHERE order_id = ?
+    # Order columns repeated on every item row; LEFT JOIN keeps item-less orders
+    query = """
+        SELECT o.order_id, o.customer_name, o.total_amount, o.created_at, o.status,
+               i.item_name, i.quantity, i.item_price, i.addons
+        FROM orders o
+        LEFT JOIN order_items i ON o.order_id = i.order_id
+        WHERE o.order_id = ?
     """
-    items_df = pd.read_sql_query(items_query, conn, params=(order_id,))
+    df = pd.read_sql_query(query, conn, params=(order_id,))
+
+    order_df = df.iloc[:1, :N_ORDER_COLS]
+    items_df = df.iloc[:, N_ORDER_COLS:].dropna(subset=['item_name'])
 
-    conn.close()
     return order_df, items_df
 
 
+# Search mode -> column matched by search_orders()
+SEARCH_COLUMNS = {
+    "Order ID": "order_id",
+    "Customer Name": "customer_name",
+}
+
+
+@st.cache_data(ttl=5, show_spinner=False)
 def search_orders(search_term, search_by):
     """Search orders by different criteria"""
-    conn = sqlite3.connect(str(DB_PATH))
+    import pandas as pd
 
-    if search_by == "Order ID":
-        query = """
-            SELECT order_id, customer_name,
-                   total_amount, created_at, status
-            FROM orders
-            WHERE order_id LIKE ?
-            ORDER BY created_at DESC
-        """
-        params = (f"%{search_term}%",)
-    else:  # Customer Name
-        query = """
-            SELECT order_id, customer_name,
-                   total_amount, created_at, status
-            FROM orders
-            WHERE customer_name LIKE ?
-            ORDER BY created_at DESC
-        """
-        params = (f"%{search_term}%",)
+    conn = get_conn()
+
+    column = SEARCH_COLUMNS.get(search_by, "customer_name")
+    query = f"""
+        SELECT order_id, customer_name,
+               total_amount, created_at, status
+        FROM orders
+        WHERE {column} LIKE ? COLLATE NOCASE
+        ORDER BY created_at DESC
+    """
+    params = (f"%{search_term}%",)
 
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
+    df = pd.read_sql_query(query, conn, params=params, dtype_backend="pyarrow")
     return df
 
 
+@st.cache_data(ttl=5)
 def get_statistics():
     """Calculate various statistics from the database"""
-    conn = sqlite3.connect(str(DB_PATH))
-
-    # Total orders
-    total_orders = pd.read_sql_query(
-        "SELECT COUNT(*) as count FROM orders", conn
-    )['count'][0]
+    import pandas as pd
 
-    # Total revenue
-    total_revenue = pd.read_sql_query(
-        "SELECT SUM(total_amount) as total FROM orders", conn
-    )['total'][0] or 0
+    conn = get_conn()
+    _ensure_schema(conn)
 
-    # Average order value
-    avg_order = pd.read_sql_query(
-        "SELECT AVG(total_amount) as avg FROM orders", conn
-    )['avg'][0] or 0
-
-    # Today's orders
-    today_orders = pd.read_sql_query(
+    # All scalar aggregates in a single pass over orders
+    total_orders, total_revenue, avg_order, today_orders, today_revenue = conn.execute(
         """
-        SELECT COUNT(*) as count FROM orders
-        WHERE date(created_at) = date('now')
-        """, conn
-    )['count'][0]
-
-    # Today's revenue
-    today_revenue = pd.read_sql_query(
+        WITH agg AS (
+            SELECT COUNT(*) AS n,
+                   SUM(total_amount) AS s,
+                   AVG(total_amount) AS a,
+                   SUM(CASE WHEN created_date = date('now') THEN 1 ELSE 0 END) AS tn,
+                   SUM(CASE WHEN created_date = date('now') THEN total_amount ELSE 0 END) AS tr
+            FROM orders
+        )
+        SELECT n, s, a, tn, tr FROM agg
         """
-        SELECT SUM(total_amount) as total FROM orders
-        WHERE date(created_at) = date('now')
-        """, conn
-    )['total'][0] or 0
+    ).fetchone()
 
     # Top items
     top_items = pd.read_sql_query(
@@ -145,51 +225,70 @@ def get_statistics():
         """, conn
     )
 
-    conn.close()
+    # Last 7 days of activity
+    daily_orders = pd.read_sql_query(
+        """
+        SELECT created_date as date,
+               COUNT(*) as order_count,
+               SUM(total_amount) as revenue
+        FROM orders
+        GROUP BY created_date
+        ORDER BY date DESC
+        LIMIT 7
+        """, conn
+    )
 
     return {
         'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'avg_order': avg_order,
-        'today_orders': today_orders,
-        'today_revenue': today_revenue,
-        'top_items': top_items
+        'total_revenue': total_revenue or 0,
+        'avg_order': avg_order or 0,
+        'today_orders': today_orders or 0,
+        'today_revenue': today_revenue or 0,
+        'top_items': top_items,
+        'daily_orders': daily_orders
     }
 
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
 def get_menu_data():
     """Load menu data from JSON file"""
+    import pandas as pd
+
     try:
-        with open(MENU_PATH, 'r', encoding='utf-8') as f:
-            menu_data = json.load(f)
-        return pd.DataFrame(menu_data)
+        menu_data = orjson.loads(MENU_PATH.read_bytes())
+        df = pd.DataFrame(menu_data)
+        # Lowercased names for the menu search box
+        df['_name_lc'] = df['name'].fillna('').str.lower()
+        return df
     except FileNotFoundError:
         st.error(f"Menu file not found at: {MENU_PATH}")
         return pd.DataFrame()
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         st.error(f"Invalid JSON in menu file")
         return pd.DataFrame()
 
 
-def display_order_card(order_row):
-    """Display a single order as a card"""
-    with st.container():
-        col1, col2, col3 = st.columns([2, 2, 1])
+@st.cache_data(ttl=300)
+def menu_meta():
+    """Category list and price bounds of the cached menu"""
+    df = get_menu_data()
+    return dict(
+        categories=["All"] + sorted(df['category'].unique().tolist()),
+        pmin=float(df['price'].min()),
+        pmax=float(df['price'].max()),
+    )
 
-        with col1:
-            st.markdown(f"**Order ID:** `{order_row['order_id']}`")
-        with col2:
-            st.markdown(f"**Customer:** {order_row['customer_name']}")
-        with col3:
-            st.markdown(f"**Total:** ${order_row['total_amount']:.2f}")
 
-        col5, col6 = st.columns([3, 1])
-        with col5:
-            st.markdown(f"**Date:** {order_row['created_at']}")
-        with col6:
-            status_color = "green" if order_row['status'] == 'confirmed' else "orange"
-            st.markdown(f"**Status:** :{status_color}[{order_row['status']}]")
+def display_order_card(order_row):
+    """Display a single order as a card"""
+    status_color = "green" if order_row['status'] == 'confirmed' else "orange"
+    st.markdown(
+        f"**Order ID:** `{order_row['order_id']}` &nbsp; "
+        f"**Customer:** {order_row['customer_name']} &nbsp; "
+        f"**Total:** ${order_row['total_amount']:.2f}\n\n"
+        f"**Date:** {order_row['created_at']} &nbsp; "
+        f"**Status:** :{status_color}[{order_row['status']}]"
+    )
 
 
 # Main Dashboard
@@ -264,31 +363,42 @@ def show_overview():
 
         if len(df) > 0:
             # Show last 10 orders
-            for idx, row in df.head(10).iterrows():
-                with st.expander(
-                    f"{row['order_id']} - {row['customer_name']} - ${row['total_amount']:.2f}",
-                    expanded=False
-                ):
-                    display_order_details_inline(row['order_id'])
+            recent_df = df.head(10)
+            st.dataframe(
+                recent_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config=ORDERS_COLCFG
+            )
+
+            selected_order = st.selectbox(
+                "Select an order to view details",
+                options=recent_df['order_id'].tolist(),
+                index=None,
+                key="recent_order_select"
+            )
+            if selected_order:
+                display_order_details_inline(selected_order)
         else:
             st.info("No orders yet.")
 
     with col2:
         st.subheader("Top Items")
         if len(stats['top_items']) > 0:
-            for idx, row in stats['top_items'].iterrows():
-                st.markdown(
-                    f"**{idx + 1}. {row['item_name']}**\n"
-                    f"- Sold: {row['total_quantity']} units\n"
-                    f"- Orders: {row['order_count']}"
-                )
-                st.markdown("---")
+            lines = [
+                f"**{rank}. {row.item_name}**\n"
+                f"- Sold: {row.total_quantity} units\n"
+                f"- Orders: {row.order_count}"
+                for rank, row in enumerate(stats['top_items'].itertuples(index=False), 1)
+            ]
+            st.markdown("\n\n---\n\n".join(lines) + "\n\n---")
         else:
             st.info("No items ordered yet.")
 
 
+@st.fragment
 def show_search():
-    """Display search interface"""
+    """Display search interface (reruns on its own when the inputs change)"""
     st.header("Search Orders")
 
     # Search controls
@@ -324,12 +434,21 @@ def show_search():
                 st.success(f"Found {len(results)} order(s)")
 
                 # Display results
-                for idx, row in results.iterrows():
-                    with st.expander(
-                        f"{row['order_id']} - {row['customer_name']} - ${row['total_amount']:.2f}",
-                        expanded=(len(results) == 1)
-                    ):
-                        display_order_details_inline(row['order_id'])
+                st.dataframe(
+                    results,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config=ORDERS_COLCFG
+                )
+
+                selected_order = st.selectbox(
+                    "Select an order to view details",
+                    options=results['order_id'].tolist(),
+                    index=0 if len(results) == 1 else None,
+                    key="search_order_select"
+                )
+                if selected_order:
+                    display_order_details_inline(selected_order)
             else:
                 st.warning(f"No orders found for '{search_term}'")
         else:
@@ -363,17 +482,7 @@ def show_all_orders():
             filtered_df,
             use_container_width=True,
             hide_index=True,
-            column_config={
-                "order_id": st.column_config.TextColumn("Order ID", width="medium"),
-                "customer_name": st.column_config.TextColumn("Customer", width="medium"),
-                "total_amount": st.column_config.NumberColumn(
-                    "Total",
-                    format="$%.2f",
-                    width="small"
-                ),
-                "created_at": st.column_config.TextColumn("Date", width="medium"),
-                "status": st.column_config.TextColumn("Status", width="small")
-            }
+            column_config=ORDERS_COLCFG
         )
 
         # Select order to view details
@@ -432,11 +541,7 @@ def show_analytics():
             st.dataframe(
                 stats['top_items'],
                 hide_index=True,
-                column_config={
-                    "item_name": "Item",
-                    "total_quantity": "Quantity Sold",
-                    "order_count": "# Orders"
-                },
+                column_config=TOP_ITEMS_COLCFG,
                 use_container_width=True
             )
     else:
@@ -447,19 +552,7 @@ def show_analytics():
     # Recent trends
     st.subheader("Recent Activity")
 
-    conn = sqlite3.connect(str(DB_PATH))
-    daily_orders = pd.read_sql_query(
-        """
-        SELECT date(created_at) as date,
-               COUNT(*) as order_count,
-               SUM(total_amount) as revenue
-        FROM orders
-        GROUP BY date(created_at)
-        ORDER BY date DESC
-        LIMIT 7
-        """, conn
-    )
-    conn.close()
+    daily_orders = stats['daily_orders']
 
     if len(daily_orders) > 0:
         col1, col2 = st.columns(2)
@@ -492,6 +585,8 @@ def show_menu():
         st.warning("No menu data available.")
         return
 
+    meta = menu_meta()
+
     # Menu statistics
     st.subheader("Menu Statistics")
     col1, col2, col3, col4 = st.columns(4)
@@ -504,28 +599,35 @@ def show_menu():
         avg_price = df['price'].mean()
         st.metric("Avg Price", f"${avg_price:.2f}")
     with col4:
-        price_range = f"${df['price'].min():.2f} - ${df['price'].max():.2f}"
+        price_range = f"${meta['pmin']:.2f} - ${meta['pmax']:.2f}"
         st.metric("Price Range", price_range)
 
     st.markdown("---")
 
+    _menu_table(df, meta)
+
+
+@st.fragment
+def _menu_table(df, meta):
+    """Menu filters, table and category breakdown (reruns on its own)"""
+    import numpy as np
+
     # Filters
     st.subheader("Filter Menu")
     col1, col2, col3 = st.columns([2, 2, 2])
 
     with col1:
         # Category filter
-        categories = ["All"] + sorted(df['category'].unique().tolist())
         selected_category = st.selectbox(
             "Filter by Category",
-            options=categories,
+            options=meta['categories'],
             key="category_filter"
         )
 
     with col2:
         # Price range filter
-        min_price = float(df['price'].min())
-        max_price = float(df['price'].max())
+        min_price = meta['pmin']
+        max_price = meta['pmax']
         price_range = st.slider(
             "Price Range ($)",
             min_value=min_price,
@@ -543,8 +645,8 @@ def show_menu():
             key="menu_search"
         )
 
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters (boolean indexing already returns new frames)
+    filtered_df = df
 
     if selected_category != "All":
         filtered_df = filtered_df[filtered_df['category'] == selected_category]
@@ -555,9 +657,8 @@ def show_menu():
     ]
 
     if search_term:
-        filtered_df = filtered_df[
-            filtered_df['name'].str.contains(search_term, case=False, na=False)
-        ]
+        names_lc = filtered_df['_name_lc'].values.astype('U')
+        filtered_df = filtered_df[np.char.find(names_lc, search_term.lower()) >= 0]
 
     st.info(f"Showing {len(filtered_df)} of {len(df)} items")
 
@@ -576,39 +677,21 @@ def show_menu():
             display_df,
             use_container_width=True,
             hide_index=True,
-            column_config={
-                "name": st.column_config.TextColumn(
-                    "Item Name",
-                    width="large",
-                    help="Name of the menu item"
-                ),
-                "category": st.column_config.TextColumn(
-                    "Category",
-                    width="medium",
-                    help="Item category"
-                ),
-                "price": st.column_config.NumberColumn(
-                    "Price",
-                    format="$%.2f",
-                    width="small",
-                    help="Price in USD"
-                )
-            }
+            column_config=MENU_COLCFG
         )
 
         # Category breakdown
         st.markdown("---")
         st.subheader("Items by Category")
 
-        category_counts = filtered_df['category'].value_counts().sort_index()
+        category_stats = filtered_df.groupby('category')['price'].agg(['size', 'mean'])
         col1, col2 = st.columns([2, 1])
 
         with col1:
-            st.bar_chart(category_counts, use_container_width=True)
+            st.bar_chart(category_stats['size'], use_container_width=True)
 
         with col2:
-            for category, count in category_counts.items():
-                avg_cat_price = filtered_df[filtered_df['category'] == category]['price'].mean()
+            for category, count, avg_cat_price in category_stats.itertuples():
                 st.markdown(
                     f"**{category.title()}**\n"
                     f"- Items: {count}\n"
@@ -619,6 +702,15 @@ def show_menu():
         st.warning("No items match your filters. Try adjusting the filters.")
 
 
+def _format_addons(raw):
+    """Render a JSON addons list as ' (a, b)', or '' when empty/invalid"""
+    try:
+        addons = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return ""
+    return f" ({', '.join(addons)})" if addons else ""
+
+
 def display_order_details_inline(order_id):
     """Display detailed order information"""
     order_df, items_df = get_order_details(order_id)
@@ -642,23 +734,19 @@ def display_order_details_inline(order_id):
         st.markdown("**Order Items:**")
 
         if len(items_df) > 0:
-            for idx, item in items_df.iterrows():
-                item_total = item['item_price'] * item['quantity']
-
-                # Parse addons
-                addons_str = ""
-                if item['addons'] and item['addons'] != 'null':
-                    try:
-                        addons = json.loads(item['addons'])
-                        if addons:
-                            addons_str = f" ({', '.join(addons)})"
-                    except:
-                        pass
-
-                st.markdown(
-                    f"- **{item['quantity']}x {item['item_name']}{addons_str}** - "
-                    f"${item['item_price']:.2f} each = ${item_total:.2f}"
-                )
+            item_total = items_df['item_price'] * items_df['quantity']
+            addons = items_df['addons']
+            addons_str = addons.where(
+                addons.notna() & (addons != 'null'), '[]'
+            ).map(_format_addons)
+
+            lines = (
+                "- **" + items_df['quantity'].astype(str) + "x "
+                + items_df['item_name'] + addons_str + "** - $"
+                + items_df['item_price'].map('{:.2f}'.format) + " each = $"
+                + item_total.map('{:.2f}'.format)
+            )
+            st.markdown("\n".join(lines))
         else:
             st.info("No items in this order")
 
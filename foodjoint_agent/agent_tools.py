@@ -2,17 +2,67 @@
 Customer Support Tools - All tools available to the voice agent
 """
 import logging
-from typing import Optional
-from foodjoint_agent.managers.product_manager import get_product_manager
-from foodjoint_agent.managers.order_manager import get_order_manager
-from foodjoint_agent.managers.faq_manager import get_faq_manager
-from foodjoint_agent.managers.session_manager import SessionManager
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Optional, TYPE_CHECKING
+
+# Managers are imported inside each tool so importing this module stays cheap
+# and a turn only loads the manager it actually uses
+if TYPE_CHECKING:
+    from foodjoint_agent.managers.session_manager import SessionManager
 
 logger = logging.getLogger(__name__)
 
+# Session-independent tools over static data (FAQs, categories) are memoized
+# per process; clear with <tool>.cache_clear() alongside the manager caches
+FAQ_SEARCH_CACHE_SIZE = 256
+
+# Fixed field order for unpacking search results into tuples in the formatters
+_SEARCH_RESULT_FIELDS = itemgetter(
+    "product_id", "product_name", "category", "_price_str", "_rating_str",
+    "review_count", "stock_available"
+)
+
+# Long tool responses, filled with str.format; price and rating arrive
+# pre-formatted from ProductManager
+_PRODUCT_DETAIL_TEMPLATE = (
+    "Product Details for {product_name}:\n"
+    "• Category: {category}\n"
+    "• Price: {_price_str}{discount_info}\n"
+    "• Rating: {_rating_str}/5.0 ({review_count} customer reviews)\n"
+    "• Stock Status: {stock_status}\n"
+    "• Delivery Time: {delivery_time_days} days\n"
+    "• Return Policy: {return_info}\n"
+    "• Description: {description}\n"
+    "• Product ID: {product_id}"
+)
+
+_ORDER_STATUS_TEMPLATE = (
+    "Order Status for {order_id}:\n"
+    "• Status: {order_status}\n"
+    "• Order Date: {order_date}{delivery_info}\n"
+    "• Total Amount: ${total_amount:.2f}\n"
+    "• Customer ID: {customer_id}\n"
+    "\n"
+    "Items Ordered:\n"
+    "{items_text}"
+)
+
+def _track_order_lookup(session: "SessionManager", order_id: str, customer_id: str) -> None:
+    """Record a viewed order and the customer it identifies"""
+    session.add_order_lookup(order_id)
+    session.set_customer_id(customer_id)
+
+
+def _track_customer_orders(session: "SessionManager", customer_id: str, order_ids: tuple) -> None:
+    """Record an identified customer and their listed orders"""
+    session.set_customer_id(customer_id)
+    session.extend_order_lookups(order_ids)
+
+
 # Tool implementations
 
-def search_products_by_name(query: str, limit: int = 5, session: Optional[SessionManager] = None) -> str:
+def search_products_by_name(query: str, limit: int = 5, session: Optional["SessionManager"] = None) -> str:
     """
     Search for products by name using fuzzy matching
 
@@ -24,6 +74,8 @@ def search_products_by_name(query: str, limit: int = 5, session: Optional[Sessio
     Returns:
         Formatted string with search results
     """
+    from foodjoint_agent.managers.product_manager import get_product_manager
+
     pm = get_product_manager()
     products = pm.search_by_name(query, limit=limit)
 
@@ -32,23 +84,20 @@ def search_products_by_name(query: str, limit: int = 5, session: Optional[Sessio
 
     # Track searches in session
     if session and products:
-        for product in products[:3]:  # Track top 3
-            session.add_product_search(product["product_id"], product["product_name"])
-
-    # Format results
-    lines = [f"Found {len(products)} product(s) matching '{query}':\n"]
-
-    for idx, product in enumerate(products, 1):
-        stock_status = "In stock" if product["stock_available"] > 0 else "Out of stock"
-        price = f"${product['price']:.2f}"
-
-        lines.append(
-            f"{idx}. {product['product_name']} ({product['category']})\n"
-            f"   Price: {price} | Rating: {product['rating']:.1f}/5.0 ({product['review_count']} reviews)\n"
-            f"   Stock: {stock_status} | Product ID: {product['product_id']}"
+        session.extend_product_searches(  # Track top 3
+            (product["product_id"], product["product_name"]) for product in products[:3]
         )
 
-    return "\n".join(lines)
+    # Format results (price/rating strings are pre-formatted by ProductManager)
+    header = f"Found {len(products)} product(s) matching '{query}':\n"
+
+    return "\n".join([header] + [
+        f"{idx}. {name} ({category})\n"
+        f"   Price: {price} | Rating: {rating}/5.0 ({reviews} reviews)\n"
+        f"   Stock: {'In stock' if stock > 0 else 'Out of stock'} | Product ID: {product_id}"
+        for idx, (product_id, name, category, price, rating, reviews, stock)
+        in enumerate(map(_SEARCH_RESULT_FIELDS, products), 1)
+    ])
 
 
 def search_products_by_category(
@@ -57,7 +106,7 @@ def search_products_by_category(
     price_max: Optional[float] = None,
     query: Optional[str] = None,
     limit: int = 10,
-    session: Optional[SessionManager] = None
+    session: Optional["SessionManager"] = None
 ) -> str:
     """
     Search products by category with optional price filtering and name search
@@ -73,13 +122,10 @@ def search_products_by_category(
     Returns:
         Formatted string with search results
     """
-    pm = get_product_manager()
-    products = pm.search_by_category(category, price_min, price_max, limit=limit)
+    from foodjoint_agent.managers.product_manager import get_product_manager
 
-    # If query is provided, filter products by name
-    if query and products:
-        query_lower = query.lower()
-        products = [p for p in products if query_lower in p['product_name'].lower()]
+    pm = get_product_manager()
+    products = pm.search_by_category(category, price_min, price_max, limit=limit, query=query)
 
     if not products:
         price_range = ""
@@ -90,12 +136,15 @@ def search_products_by_category(
         elif price_max:
             price_range = f" below ${price_max:.2f}"
 
-        return f"No products found in category '{category}'{price_range}. Try a different category or price range."
+        name_filter = f" matching '{query}'" if query else ""
+
+        return f"No products found in category '{category}'{name_filter}{price_range}. Try a different category or price range."
 
     # Track in session
     if session and products:
-        for product in products[:3]:
-            session.add_product_search(product["product_id"], product["product_name"])
+        session.extend_product_searches(
+            (product["product_id"], product["product_name"]) for product in products[:3]
+        )
 
     # Format results
     price_filter = ""
@@ -107,21 +156,18 @@ def search_products_by_category(
         else:
             price_filter = f" (below ${price_max:.2f})"
 
-    lines = [f"Found {len(products)} product(s) in '{category}'{price_filter}:\n"]
+    header = f"Found {len(products)} product(s) in '{category}'{price_filter}:\n"
 
-    for idx, product in enumerate(products, 1):
-        stock_status = "In stock" if product["stock_available"] > 0 else "Out of stock"
+    return "\n".join([header] + [
+        f"{idx}. {name}\n"
+        f"   Price: {price} | Rating: {rating}/5.0\n"
+        f"   {'In stock' if stock > 0 else 'Out of stock'} | Product ID: {product_id}"
+        for idx, (product_id, name, _, price, rating, _, stock)
+        in enumerate(map(_SEARCH_RESULT_FIELDS, products), 1)
+    ])
 
-        lines.append(
-            f"{idx}. {product['product_name']}\n"
-            f"   Price: ${product['price']:.2f} | Rating: {product['rating']:.1f}/5.0\n"
-            f"   {stock_status} | Product ID: {product['product_id']}"
-        )
 
-    return "\n".join(lines)
-
-
-def get_product_details(product_id: str, session: Optional[SessionManager] = None) -> str:
+def get_product_details(product_id: str, session: Optional["SessionManager"] = None) -> str:
     """
     Get detailed information about a specific product
 
@@ -132,15 +178,23 @@ def get_product_details(product_id: str, session: Optional[SessionManager] = Non
     Returns:
         Formatted product details
     """
+    cache_key = ("get_product_details", product_id)
+    cached = session.get_tool_result(cache_key) if session else None
+    if cached is not None:
+        return cached
+
+    from foodjoint_agent.managers.product_manager import get_product_manager
+
     pm = get_product_manager()
     product = pm.get_product_details(product_id)
 
     if not product:
         return f"Product {product_id} not found. Please verify the Product ID."
 
-    # Track in session
-    if session:
-        session.add_product_search(product["product_id"], product["product_name"])
+    # Track in session (replayed when the cached result is reused)
+    track = partial(session.add_product_search, product["product_id"], product["product_name"]) if session else None
+    if track:
+        track()
 
     # Format details
     stock_status = "In stock" if product["stock_available"] > 0 else "Out of stock"
@@ -153,66 +207,85 @@ def get_product_details(product_id: str, session: Optional[SessionManager] = Non
 
     return_info = "Eligible for return" if product["return_eligible"] else "Not eligible for return (hygiene/safety reasons)"
 
-    return f"""
-Product Details for {product['product_name']}:
-• Category: {product['category']}
-• Price: ${product['price']:.2f}{discount_info}
-• Rating: {product['rating']:.1f}/5.0 ({product['review_count']} customer reviews)
-• Stock Status: {stock_status}
-• Delivery Time: {product['delivery_time_days']} days
-• Return Policy: {return_info}
-• Description: {product['description']}
-• Product ID: {product['product_id']}
-""".strip()
+    result = _PRODUCT_DETAIL_TEMPLATE.format(
+        discount_info=discount_info,
+        stock_status=stock_status,
+        return_info=return_info,
+        **product
+    ).strip()
+
+    if session:
+        session.cache_tool_result(cache_key, result, on_hit=track)
+
+    return result
 
 
-def check_product_availability(product_id: str) -> str:
+def check_product_availability(product_id: str, session: Optional["SessionManager"] = None) -> str:
     """
     Check if a product is in stock
 
     Args:
         product_id: Product ID
+        session: Session manager
 
     Returns:
         Stock availability message
     """
+    cache_key = ("check_product_availability", product_id)
+    cached = session.get_tool_result(cache_key) if session else None
+    if cached is not None:
+        return cached
+
+    from foodjoint_agent.managers.product_manager import get_product_manager
+
     pm = get_product_manager()
     result = pm.check_availability(product_id)
 
+    if session:
+        session.cache_tool_result(cache_key, result["message"])
+
     return result["message"]
 
 
-def get_product_faqs(product_id: str) -> str:
+def get_product_faqs(product_id: str, session: Optional["SessionManager"] = None) -> str:
     """
     Get frequently asked questions for a specific product
 
     Args:
         product_id: Product ID
+        session: Session manager
 
     Returns:
         Formatted FAQs
     """
+    cache_key = ("get_product_faqs", product_id)
+    cached = session.get_tool_result(cache_key) if session else None
+    if cached is not None:
+        return cached
+
+    from foodjoint_agent.managers.faq_manager import get_faq_manager
+
     fm = get_faq_manager()
-    faqs = fm.get_product_faqs(product_id)
+    faqs = fm.get_product_faqs_with_name(product_id)
 
     if not faqs:
         return f"No FAQs available for product {product_id}."
 
-    # Get product name
-    pm = get_product_manager()
-    product = pm.get_product_details(product_id)
-    product_name = product["product_name"] if product else product_id
-
-    lines = [f"FAQs for {product_name}:\n"]
+    lines = [f"FAQs for {faqs[0]['product_name'] or product_id}:\n"]
 
     for idx, faq in enumerate(faqs, 1):
         lines.append(f"{idx}. Q: {faq['question']}")
         lines.append(f"   A: {faq['answer']}\n")
 
-    return "\n".join(lines)
+    result = "\n".join(lines)
+
+    if session:
+        session.cache_tool_result(cache_key, result)
 
+    return result
 
-def track_order(order_id: str, session: Optional[SessionManager] = None) -> str:
+
+def track_order(order_id: str, session: Optional["SessionManager"] = None) -> str:
     """
     Track an order by Order ID
 
@@ -223,16 +296,23 @@ def track_order(order_id: str, session: Optional[SessionManager] = None) -> str:
     Returns:
         Order status and tracking information
     """
+    cache_key = ("track_order", order_id)
+    cached = session.get_tool_result(cache_key) if session else None
+    if cached is not None:
+        return cached
+
+    from foodjoint_agent.managers.order_manager import get_order_manager
+
     om = get_order_manager()
     order = om.get_order(order_id)
 
     if not order:
         return f"Order {order_id} not found. Please verify your Order ID or try searching by Customer ID."
 
-    # Track in session and identify customer
-    if session:
-        session.add_order_lookup(order_id)
-        session.set_customer_id(order["customer_id"])
+    # Track in session and identify customer (replayed when the cached result is reused)
+    track = partial(_track_order_lookup, session, order_id, order["customer_id"]) if session else None
+    if track:
+        track()
 
     # Format order info
     items_list = [f"  - {item['product_name']} (Quantity: {item['quantity']})" for item in order["items"]]
@@ -242,19 +322,19 @@ def track_order(order_id: str, session: Optional[SessionManager] = None) -> str:
     if order["delivery_date"]:
         delivery_info = f"\n• Expected Delivery: {order['delivery_date']}"
 
-    return f"""
-Order Status for {order_id}:
-• Status: {order['order_status']}
-• Order Date: {order['order_date']}{delivery_info}
-• Total Amount: ${order['total_amount']:.2f}
-• Customer ID: {order['customer_id']}
+    result = _ORDER_STATUS_TEMPLATE.format(
+        items_text=items_text,
+        delivery_info=delivery_info,
+        **order
+    ).strip()
+
+    if session:
+        session.cache_tool_result(cache_key, result, on_hit=track)
 
-Items Ordered:
-{items_text}
-""".strip()
+    return result
 
 
-def get_customer_orders(customer_id: str, limit: int = 5, session: Optional[SessionManager] = None) -> str:
+def get_customer_orders(customer_id: str, limit: int = 5, session: Optional["SessionManager"] = None) -> str:
     """
     Get recent orders for a customer
 
@@ -266,17 +346,24 @@ def get_customer_orders(customer_id: str, limit: int = 5, session: Optional[Sess
     Returns:
         List of customer's recent orders
     """
+    cache_key = ("get_customer_orders", customer_id, limit)
+    cached = session.get_tool_result(cache_key) if session else None
+    if cached is not None:
+        return cached
+
+    from foodjoint_agent.managers.order_manager import get_order_manager
+
     om = get_order_manager()
     orders = om.get_customer_orders(customer_id, limit=limit)
 
     if not orders:
         return f"No orders found for Customer {customer_id}."
 
-    # Track in session
-    if session:
-        session.set_customer_id(customer_id)
-        for order in orders[:3]:
-            session.add_order_lookup(order["order_id"])
+    # Track in session (replayed when the cached result is reused)
+    order_ids = tuple(order["order_id"] for order in orders[:3])
+    track = partial(_track_customer_orders, session, customer_id, order_ids) if session else None
+    if track:
+        track()
 
     lines = [f"Recent orders for Customer {customer_id}:\n"]
 
@@ -290,10 +377,15 @@ def get_customer_orders(customer_id: str, limit: int = 5, session: Optional[Sess
             f"   Total: ${order['total_amount']:.2f} | Items: {items_preview}"
         )
 
-    return "\n".join(lines)
+    result = "\n".join(lines)
 
+    if session:
+        session.cache_tool_result(cache_key, result, on_hit=track)
+
+    return result
 
-def get_order_details(order_id: str, session: Optional[SessionManager] = None) -> str:
+
+def get_order_details(order_id: str, session: Optional["SessionManager"] = None) -> str:
     """
     Get detailed information about an order (similar to track_order but more comprehensive)
 
@@ -307,7 +399,7 @@ def get_order_details(order_id: str, session: Optional[SessionManager] = None) -
     return track_order(order_id, session)
 
 
-def cancel_order(order_id: str, reason: str, session: Optional[SessionManager] = None) -> str:
+def cancel_order(order_id: str, reason: str, session: Optional["SessionManager"] = None) -> str:
     """
     Cancel an order (policy-aware)
 
@@ -319,17 +411,20 @@ def cancel_order(order_id: str, reason: str, session: Optional[SessionManager] =
     Returns:
         Cancellation result message
     """
+    from foodjoint_agent.managers.order_manager import get_order_manager
+
     om = get_order_manager()
     result = om.cancel_order(order_id, reason)
 
-    # Track in session
+    # Track in session; the order's status changed, so drop cached views of it
     if session and result["success"]:
         session.add_order_lookup(order_id)
+        session.invalidate_tool_results(order_id, tools=("get_customer_orders",))
 
     return result["message"]
 
 
-def initiate_return(order_id: str, product_id: str, reason: str, session: Optional[SessionManager] = None) -> str:
+def initiate_return(order_id: str, product_id: str, reason: str, session: Optional["SessionManager"] = None) -> str:
     """
     Initiate return for a product (policy-aware)
 
@@ -342,16 +437,20 @@ def initiate_return(order_id: str, product_id: str, reason: str, session: Option
     Returns:
         Return initiation result
     """
+    from foodjoint_agent.managers.order_manager import get_order_manager
+
     om = get_order_manager()
     result = om.initiate_return(order_id, product_id, reason)
 
-    # Track in session
+    # Track in session and drop cached views of the affected order/product
     if session and result["success"]:
         session.add_order_lookup(order_id)
+        session.invalidate_tool_results(order_id, product_id, tools=("get_customer_orders",))
 
     return result["message"]
 
 
+@lru_cache(maxsize=FAQ_SEARCH_CACHE_SIZE)
 def search_faqs(query: str, limit: int = 5) -> str:
     """
     Search across all product FAQs
@@ -363,6 +462,8 @@ def search_faqs(query: str, limit: int = 5) -> str:
     Returns:
         Relevant FAQs
     """
+    from foodjoint_agent.managers.faq_manager import get_faq_manager
+
     fm = get_faq_manager()
     faqs = fm.search_all_faqs(query, limit=limit)
 
@@ -381,6 +482,7 @@ def search_faqs(query: str, limit: int = 5) -> str:
     return "\n".join(lines)
 
 
+@lru_cache(maxsize=1)
 def get_all_categories() -> str:
     """
     Get list of all available product categories
@@ -388,7 +490,17 @@ def get_all_categories() -> str:
     Returns:
         List of categories
     """
+    from foodjoint_agent.managers.product_manager import get_product_manager
+
     pm = get_product_manager()
     categories = pm.get_all_categories()
 
     return "Available product categories:\n" + "\n".join([f"• {cat}" for cat in categories])
+
+
+def invalidate_categories_cache() -> None:
+    """Forget cached categories (and the catalog they come from) after the catalog changes"""
+    from foodjoint_agent.managers.product_manager import get_product_manager
+
+    get_product_manager.cache_clear()
+    get_all_categories.cache_clear()
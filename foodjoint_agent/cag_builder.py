@@ -2,11 +2,12 @@
 CAG Builder - Build Cache-Augmented Generation context
 Embeds policies and static data in system prompt
 """
-import json
 import logging
 from pathlib import Path
 from functools import lru_cache
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -20,8 +21,7 @@ def build_policy_context() -> str:
         Formatted policy text for embedding
     """
     try:
-        with open(DATA_DIR / "company_return_refund_policy.json", "r", encoding="utf-8") as f:
-            policy_data = json.load(f)
+        policy_data = orjson.loads((DATA_DIR / "company_return_refund_policy.json").read_bytes())
 
         sections = policy_data.get("sections", {})
 
@@ -140,3 +140,8 @@ def build_cag_context() -> str:
 
 {build_order_status_context()}
 """
+
+# Built eagerly so the JSON parse and formatting happen at import (worker
+# startup) rather than on the first user turn; read it through the builders
+# so prompts.invalidate_system_prompt() can refresh it
+build_cag_context()
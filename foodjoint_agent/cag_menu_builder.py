@@ -7,11 +7,13 @@ the need for tool calls to query the menu, reducing latency significantly.
 """
 from __future__ import annotations
 
-import json
 from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List
 
+import orjson
+
 
 def _default_menu_path() -> Path:
     return Path(__file__).resolve().parent.parent / "database" / "food_menu.json"
@@ -22,17 +24,26 @@ def load_menu(menu_path: Path | None = None) -> List[Dict]:
     path = menu_path or _default_menu_path()
     if not path.exists():
         raise FileNotFoundError(f"Menu file not found at {path}")
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(path.read_bytes())
 
 
 def _group_by_category(menu_data: List[Dict]) -> Dict[str, List[Dict]]:
-    """Group menu items by category."""
+    """
+    Group menu items by category, dropping duplicate names within a category
+    (first occurrence wins) and tagging each item with a `_sort_key`.
+    """
     categories: Dict[str, List[Dict]] = {}
+    seen_per_cat: Dict[str, set] = {}
     for item in menu_data:
         cat = item.get("category", "other").lower()
         if cat not in categories:
             categories[cat] = []
+            seen_per_cat[cat] = set()
+        name = item.get("name", "").lower().strip()
+        if not name or name in seen_per_cat[cat]:
+            continue
+        seen_per_cat[cat].add(name)
+        item["_sort_key"] = item.get("name", "").lower()
         categories[cat].append(item)
     return categories
 
@@ -47,18 +58,6 @@ def _format_item(item: Dict) -> str:
     return f"- {name} (free)"
 
 
-def _deduplicate_items(items: List[Dict]) -> List[Dict]:
-    """Remove duplicate items based on name (keep first occurrence)."""
-    seen_names = set()
-    unique_items = []
-    for item in items:
-        name = item.get("name", "").lower().strip()
-        if name and name not in seen_names:
-            seen_names.add(name)
-            unique_items.append(item)
-    return unique_items
-
-
 @lru_cache(maxsize=1)
 def build_menu_context(menu_path: Path | None = None) -> str:
     """
@@ -94,9 +93,9 @@ def build_menu_context(menu_path: Path | None = None) -> str:
 
     for cat_key, cat_title in category_order:
         if cat_key in categories:
-            items = _deduplicate_items(categories[cat_key])
+            items = categories[cat_key]
             # Sort items by name for consistency
-            items.sort(key=lambda x: x.get("name", "").lower())
+            items.sort(key=itemgetter("_sort_key"))
 
             lines.append(f"### {cat_title.upper()}")
             lines.append("-" * 40)
@@ -111,8 +110,7 @@ def build_menu_context(menu_path: Path | None = None) -> str:
     handled_cats = {cat for cat, _ in category_order}
     for cat_key, items in categories.items():
         if cat_key not in handled_cats:
-            items = _deduplicate_items(items)
-            items.sort(key=lambda x: x.get("name", "").lower())
+            items.sort(key=itemgetter("_sort_key"))
 
             lines.append(f"### {cat_key.upper()}")
             lines.append("-" * 40)
@@ -143,6 +141,11 @@ def get_menu_item_names(menu_path: Path | None = None) -> List[str]:
     return names
 
 
+# Built eagerly at import so the first session does not pay for parsing and
+# formatting the menu; None when the menu file has not been provided
+MENU_CONTEXT = build_menu_context() if _default_menu_path().exists() else None
+
+
 if __name__ == "__main__":
     # Test the menu builder
     menu_context = build_menu_context()
@@ -3,6 +3,7 @@ Database utilities for SQLite operations
 """
 import sqlite3
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -12,19 +13,62 @@ logger = logging.getLogger(__name__)
 DB_DIR = Path(__file__).parent.parent.parent / "database"
 DB_PATH = DB_DIR / "ecommerce.db"
 
+# Bump when the DDL in initialize_database changes; stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
+# One long-lived connection per thread; callers must not close it
+_local = threading.local()
+
+# Compiled statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    # Wait on a locked database instead of failing a tool call after 5s
+    "PRAGMA busy_timeout=30000",
+)
+
 def get_connection() -> sqlite3.Connection:
-    """Get database connection with row factory"""
-    DB_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
+    """Get this thread's database connection (autocommit, row factory)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        DB_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(DB_PATH),
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
     return conn
 
+def close_connection():
+    """Close this thread's cached connection, if one is open"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
 def initialize_database():
     """Create database tables if they don't exist"""
     conn = get_connection()
     cursor = conn.cursor()
 
+    # Schema already at this version: skip all the IF NOT EXISTS lookups
+    if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+
     try:
+        # Connections run in autocommit mode, so group the DDL explicitly
+        cursor.execute("BEGIN IMMEDIATE")
+
         # Products table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS products (
@@ -37,31 +81,39 @@ def initialize_database():
                 review_count INTEGER,
                 description TEXT,
                 discount_percentage INTEGER,
-                return_eligible BOOLEAN,
+                return_eligible INTEGER NOT NULL DEFAULT 0,
                 delivery_time_days INTEGER
             )
         """)
 
         # Create indexes for products
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON products(category)")
+        # (category, price, rating) serves category browsing with price bounds;
+        # it makes the single-column category index redundant
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cat_price_rating ON products(category, price, rating DESC)"
+        )
+        cursor.execute("DROP INDEX IF EXISTS idx_category")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_price ON products(price)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_rating ON products(rating)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_product_name ON products(product_name)")
 
-        # Orders table
+        # Orders table (dates are Unix epoch seconds, UTC midnight)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS orders (
                 order_id TEXT PRIMARY KEY,
                 customer_id TEXT NOT NULL,
                 order_status TEXT NOT NULL,
-                order_date DATE NOT NULL,
+                order_date INTEGER NOT NULL,
                 total_amount REAL,
-                delivery_date DATE
+                delivery_date INTEGER
             )
         """)
 
         # Create indexes for orders
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_customer ON orders(customer_id)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_customer_order_date ON orders(customer_id, order_date DESC)"
+        )
+        cursor.execute("DROP INDEX IF EXISTS idx_customer")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON orders(order_status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_date ON orders(order_date)")
 
@@ -81,19 +133,113 @@ def initialize_database():
 
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
 
-        # Product FAQs table
+        # Product FAQs table; product_name is copied from products so FAQ
+        # reads don't need a join, and triggers keep the copy current
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS product_faqs (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 product_id TEXT NOT NULL,
                 question TEXT NOT NULL,
                 answer TEXT NOT NULL,
+                product_name TEXT,
                 FOREIGN KEY (product_id) REFERENCES products(product_id)
             )
         """)
 
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_faq_product ON product_faqs(product_id)")
 
+        faq_columns = {row["name"] for row in cursor.execute("PRAGMA table_info(product_faqs)")}
+        if "product_name" not in faq_columns:
+            cursor.execute("ALTER TABLE product_faqs ADD COLUMN product_name TEXT")
+        cursor.execute("""
+            UPDATE product_faqs
+            SET product_name = (
+                SELECT p.product_name FROM products p WHERE p.product_id = product_faqs.product_id
+            )
+            WHERE product_name IS NULL
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS product_faqs_name_ai AFTER INSERT ON product_faqs
+            WHEN new.product_name IS NULL BEGIN
+                UPDATE product_faqs
+                SET product_name = (SELECT product_name FROM products WHERE product_id = new.product_id)
+                WHERE id = new.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS products_name_au AFTER UPDATE OF product_name ON products BEGIN
+                UPDATE product_faqs SET product_name = new.product_name
+                WHERE product_id = new.product_id;
+            END
+        """)
+
+        # Full-text (trigram) indexes over product names and FAQs, kept in
+        # sync with their content tables by triggers
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('products_fts', 'faqs_fts')"
+        )
+        existing_fts = {row["name"] for row in cursor}
+
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                product_name, description,
+                content='products', content_rowid='rowid', tokenize='trigram'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts(rowid, product_name, description)
+                VALUES (new.rowid, new.product_name, new.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, product_name, description)
+                VALUES ('delete', old.rowid, old.product_name, old.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+                INSERT INTO products_fts(products_fts, rowid, product_name, description)
+                VALUES ('delete', old.rowid, old.product_name, old.description);
+                INSERT INTO products_fts(rowid, product_name, description)
+                VALUES (new.rowid, new.product_name, new.description);
+            END
+        """)
+
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS faqs_fts USING fts5(
+                question, answer,
+                content='product_faqs', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS faqs_fts_ai AFTER INSERT ON product_faqs BEGIN
+                INSERT INTO faqs_fts(rowid, question, answer)
+                VALUES (new.id, new.question, new.answer);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS faqs_fts_ad AFTER DELETE ON product_faqs BEGIN
+                INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
+                VALUES ('delete', old.id, old.question, old.answer);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS faqs_fts_au AFTER UPDATE ON product_faqs BEGIN
+                INSERT INTO faqs_fts(faqs_fts, rowid, question, answer)
+                VALUES ('delete', old.id, old.question, old.answer);
+                INSERT INTO faqs_fts(rowid, question, answer)
+                VALUES (new.id, new.question, new.answer);
+            END
+        """)
+
+        # Index rows that were loaded before the FTS tables existed
+        if "products_fts" not in existing_fts:
+            cursor.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        if "faqs_fts" not in existing_fts:
+            cursor.execute("INSERT INTO faqs_fts(faqs_fts) VALUES ('rebuild')")
+
         # Customers table (optional)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS customers (
@@ -102,6 +248,8 @@ def initialize_database():
             )
         """)
 
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
         conn.commit()
         logger.info("Database initialized successfully")
 
@@ -109,8 +257,12 @@ def initialize_database():
         conn.rollback()
         logger.error(f"Error initializing database: {e}")
         raise
-    finally:
-        conn.close()
 
-# Initialize on module load
-initialize_database()
+_bootstrapped = False
+
+def bootstrap():
+    """Create the schema once per process; call explicitly at application start"""
+    global _bootstrapped
+    if not _bootstrapped:
+        initialize_database()
+        _bootstrapped = True
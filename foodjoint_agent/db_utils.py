@@ -5,11 +5,17 @@ Handles SQLite database operations for saving and retrieving orders.
 """
 from __future__ import annotations
 
-import json
+import itertools
 import logging
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +23,91 @@ DB_PATH = Path(__file__).resolve().parent.parent / "database" / "orders.db"
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 ORDER_COLUMNS = ["order_id", "customer_name", "total_amount", "created_at", "status"]
 
+# Applied to every connection; journal_mode=WAL persists in the file and is
+# set once by initialize_database()
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    # Serve list queries from mapped pages instead of read() syscalls
+    "PRAGMA mmap_size=268435456",
+)
+
+
+# Query text lives at module scope so each call reuses sqlite3's cached statement
+STATEMENT_CACHE_SIZE = 256
+
+_SQL_INSERT_ORDER = """
+    INSERT INTO orders (order_id, customer_name, total_amount, status)
+    VALUES (?, ?, ?, 'confirmed')
+"""
+_SQL_INSERT_ITEM = """
+    INSERT INTO order_items (order_id, item_name, quantity, item_price, addons)
+    VALUES (?, ?, ?, ?, ?)
+"""
+# Order header repeated per item; item columns are NULL for an order with no items
+_SQL_GET_ORDER = """
+    SELECT o.order_id, o.customer_name, o.total_amount, o.created_at, o.status,
+           i.item_name, i.quantity, i.item_price, i.addons
+    FROM orders o
+    LEFT JOIN order_items i ON i.order_id = o.order_id
+    WHERE o.order_id = ?
+"""
+_SQL_LIST_ORDERS = """
+    SELECT order_id, customer_name, total_amount, created_at, status
+    FROM orders
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+# Readers share a small pool; all writes go through one connection under a lock
+POOL_SIZE = 4
+_read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+_write_conn: Optional[sqlite3.Connection] = None
+_write_lock = threading.Lock()
+
 
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(str(DB_PATH))
+    """Get a new database connection with row factory."""
+    conn = sqlite3.connect(
+        str(DB_PATH), check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+@contextmanager
+def borrow_conn(write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Check out a pooled connection (the shared writer if write=True) for a block."""
+    global _write_conn
+    if write:
+        with _write_lock:
+            if _write_conn is None:
+                _write_conn = get_connection()
+            yield _write_conn
+        return
+
+    # The pool fills lazily up to POOL_SIZE; extra connections under load are
+    # closed instead of returned
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        conn = get_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            _read_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
 def _get_orders_columns(cursor: sqlite3.Cursor) -> List[str]:
     """Get current column names from orders table."""
     cursor.execute("PRAGMA table_info(orders)")
-    return [row["name"] for row in cursor.fetchall()]
+    return [row["name"] for row in cursor]
 
 
 def _rebuild_orders_table(cursor: sqlite3.Cursor, existing_columns: List[str]) -> None:
@@ -59,9 +138,15 @@ def _rebuild_orders_table(cursor: sqlite3.Cursor, existing_columns: List[str]) -
 def initialize_database() -> None:
     """Initialize database schema."""
     logger.info("Ensuring database schema exists at %s", DB_PATH)
-    conn = get_connection()
+    with borrow_conn(write=True) as conn:
+        _initialize_schema(conn)
+
+
+def _initialize_schema(conn: sqlite3.Connection) -> None:
+    """Create or migrate the schema on the given connection."""
     cursor = conn.cursor()
     try:
+        cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute(
             "SELECT name FROM sqlite_master WHERE type='table' AND name='orders'"
         )
@@ -81,6 +166,11 @@ def initialize_database() -> None:
                 )
                 """
             )
+        # Lets get_all_orders read the newest orders straight off the index;
+        # created after any rebuild above, which drops the old table's indexes
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_orders_created ON orders(created_at DESC)"
+        )
         cursor.execute(
             """
             CREATE TABLE IF NOT EXISTS order_items (
@@ -89,18 +179,26 @@ def initialize_database() -> None:
                 item_name TEXT NOT NULL,
                 quantity INTEGER NOT NULL,
                 item_price REAL NOT NULL,
-                addons TEXT,
+                addons BLOB,
                 FOREIGN KEY (order_id) REFERENCES orders(order_id)
             )
             """
         )
+        # Same name as the dashboard's index so the two never duplicate it
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_items_order ON order_items(order_id)"
+        )
         conn.commit()
     except Exception as exc:
         conn.rollback()
         logger.exception("Error initializing database: %s", exc)
         raise
-    finally:
-        conn.close()
+
+
+@lru_cache(maxsize=1)
+def _ensured() -> None:
+    """Initialize the schema on first use; later calls are free."""
+    initialize_database()
 
 
 def save_order(
@@ -111,113 +209,68 @@ def save_order(
 ) -> bool:
     """Save an order to the database."""
     logger.info("Saving order %s (%s items)", order_id, len(order_items))
-    conn = get_connection()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute(
-            """
-            INSERT INTO orders (order_id, customer_name, total_amount, status)
-            VALUES (?, ?, ?, 'confirmed')
-            """,
-            (order_id, customer_name, total_amount),
-        )
-
-        for item in order_items:
-            addons_json = json.dumps(item.get("addons", [])) if item.get("addons") else None
-            cursor.execute(
-                """
-                INSERT INTO order_items (order_id, item_name, quantity, item_price, addons)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    order_id,
-                    item["item_name"],
-                    item["quantity"],
-                    item["item_price"],
-                    addons_json,
-                ),
+        _ensured()
+        item_rows = [
+            (
+                order_id,
+                item["item_name"],
+                item["quantity"],
+                item["item_price"],
+                orjson.dumps(item["addons"]) if item.get("addons") else None,
             )
+            for item in order_items
+        ]
 
-        conn.commit()
+        # One transaction (and one commit) for the order and all its items;
+        # IMMEDIATE takes the write lock up front instead of upgrading mid-way
+        with borrow_conn(write=True) as conn, conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(_SQL_INSERT_ORDER, (order_id, customer_name, total_amount))
+            cursor.executemany(_SQL_INSERT_ITEM, item_rows)
         return True
     except Exception as exc:
         logger.exception("Failed to save order %s: %s", order_id, exc)
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 
 def get_order(order_id: str) -> Optional[Dict]:
     """Retrieve an order by ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,))
+    _ensured()
+    with borrow_conn() as conn:
+        cursor = conn.cursor()
+        # Plain tuples: the column order is fixed by _SQL_GET_ORDER
+        cursor.row_factory = None
+        cursor.execute(_SQL_GET_ORDER, (order_id,))
         order_row = cursor.fetchone()
-        if not order_row:
+        if order_row is None:
             return None
 
-        cursor.execute("SELECT * FROM order_items WHERE order_id = ?", (order_id,))
-        items_rows = cursor.fetchall()
-
-        order = {
-            "order_id": order_row["order_id"],
-            "customer_name": order_row["customer_name"],
-            "total_amount": order_row["total_amount"],
-            "created_at": order_row["created_at"],
-            "status": order_row["status"],
-            "items": [],
-        }
-
-        for item_row in items_rows:
-            order["items"].append(
+        # Stream the remaining joined rows rather than materializing them all
+        rows = itertools.chain((order_row,), cursor)
+        return {
+            **dict(zip(ORDER_COLUMNS, order_row)),
+            "items": [
                 {
-                    "item_name": item_row["item_name"],
-                    "quantity": item_row["quantity"],
-                    "item_price": item_row["item_price"],
-                    "addons": json.loads(item_row["addons"]) if item_row["addons"] else [],
+                    "item_name": item_name,
+                    "quantity": quantity,
+                    "item_price": item_price,
+                    "addons": orjson.loads(addons) if addons else [],
                 }
-            )
-
-        return order
-    finally:
-        conn.close()
+                for *_, item_name, quantity, item_price, addons in rows
+                if item_name is not None
+            ],
+        }
 
 
 def get_all_orders(limit: int = 100) -> List[Dict]:
     """Get all orders with optional limit."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """
-            SELECT order_id, customer_name, total_amount, created_at, status
-            FROM orders
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            (limit,),
-        )
-        orders = []
-        for row in cursor.fetchall():
-            orders.append(
-                {
-                    "order_id": row["order_id"],
-                    "customer_name": row["customer_name"],
-                    "total_amount": row["total_amount"],
-                    "created_at": row["created_at"],
-                    "status": row["status"],
-                }
-            )
-        return orders
-    finally:
-        conn.close()
-
+    _ensured()
+    with borrow_conn() as conn:
+        cursor = conn.cursor()
+        # The query selects exactly ORDER_COLUMNS, so plain tuples zip straight into dicts
+        cursor.row_factory = None
+        cursor.execute(_SQL_LIST_ORDERS, (limit,))
+        return [dict(zip(ORDER_COLUMNS, row)) for row in cursor]
 
-# Ensure schema exists when the module loads
-try:
-    initialize_database()
-except Exception:
-    pass
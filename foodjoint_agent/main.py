@@ -12,15 +12,17 @@ Key features:
 - Faster responses for policy-related questions
 """
 import asyncio
-import json
+import itertools
 import logging
-import math
 import os
 import random
+from functools import lru_cache, partial, wraps
 from logging import getLogger
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Optional
 
+import numpy as np
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -30,8 +32,9 @@ from google import genai
 from google.genai import types
 
 from . import agent_tools
+from .db.db_utils import bootstrap
 from .managers.session_manager import SessionManager
-from .prompts import SYSTEM_PROMPT, WELCOME_MESSAGE
+from .prompts import WELCOME_MESSAGE, get_prompt_fingerprint, get_system_prompt
 
 load_dotenv()
 
@@ -50,25 +53,37 @@ FILLER_GAP_MIN_S = 0.5
 FILLER_GAP_MAX_S = 1.2
 FILLER_AUDIO_GUARD_S = 0.25
 FILLER_MAX_PER_TURN = 3
+CLIENT_KEEPALIVE_IDLE_S = 30.0
+# 50 ms of 16 kHz 16-bit silence, sent as-is on every keepalive
+_KEEPALIVE_SILENCE = types.Blob(data=bytes(1600), mime_type=INPUT_AUDIO_MIME)
+AUDIO_BATCH_MAX_BYTES = 64 * 1024
+TRANSCRIPT_FLUSH_DELAY_S = 0.015
+
+
+_TRUTHY: frozenset[str] = frozenset({"1", "true", "yes", "on"})
 
 
 def _env_flag(name: str, default: bool = False) -> bool:
     value = os.getenv(name)
     if value is None:
         return default
-    return value.strip().lower() in {"1", "true", "yes", "on"}
+    return value.strip().lower() in _TRUTHY
 
 
 app = FastAPI(title="E-commerce Voice Agent (CAG)")
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    bootstrap()
+    # Load the catalog now so IN_MEMORY_TOOLS never block the event loop on it
+    from .managers.product_manager import get_product_manager
+    get_product_manager()
 website_files_path = Path(__file__).parent / "website"
 app.mount("/static", StaticFiles(directory=website_files_path / "static"), name="static")
 templates = Jinja2Templates(directory=website_files_path / "templates")
 
 
+@lru_cache(maxsize=1)
 def _build_tool_declarations() -> list[dict[str, Any]]:
     """
     CAG TOOL DECLARATIONS - E-commerce customer support tools.
@@ -230,40 +245,49 @@ def _synthesize_filler_clip(duration_ms: int, frequency: float, amplitude: float
     sample_rate = FILLER_SAMPLE_RATE
     total_samples = max(1, int(sample_rate * duration_ms / 1000))
     taper_samples = min(total_samples // 2, max(1, int(sample_rate * 0.03)))
-    buf = bytearray()
-    for i in range(total_samples):
-        env = 1.0
-        if i < taper_samples:
-            env *= i / taper_samples
-        if i > total_samples - taper_samples:
-            env *= (total_samples - i) / taper_samples
-        sample = math.sin(2 * math.pi * frequency * i / sample_rate)
-        value = int(sample * amplitude * env * 32767)
-        value = max(-32767, min(32767, value))
-        buf.extend(value.to_bytes(2, "little", signed=True))
-    return bytes(buf)
-
-
-def _build_filler_clips() -> list[bytes]:
+    i = np.arange(total_samples, dtype=np.float64)
+    # Linear fade in and out over taper_samples at each end
+    env = np.ones(total_samples)
+    head = i < taper_samples
+    env[head] *= i[head] / taper_samples
+    tail = i > total_samples - taper_samples
+    env[tail] *= (total_samples - i[tail]) / taper_samples
+    samples = np.sin(2 * np.pi * frequency * i / sample_rate) * amplitude * env * 32767
+    return np.trunc(samples).clip(-32767, 32767).astype("<i2").tobytes()
+
+
+def _build_filler_clips() -> tuple[bytes, ...]:
     """Precompute filler audio clips."""
-    return [
+    return (
         _synthesize_filler_clip(320, 190.0, 0.12),
         _synthesize_filler_clip(420, 150.0, 0.1),
         _synthesize_filler_clip(260, 230.0, 0.09),
-    ]
+    )
 
 
 FILLER_CLIPS = _build_filler_clips()
+# Clips are handed out round-robin from an order shuffled once at startup
+_filler_clip_cycle = itertools.cycle(random.sample(FILLER_CLIPS, len(FILLER_CLIPS)))
 
 
-def _build_live_config(voice_name: Optional[str], use_client_vad: bool) -> dict[str, Any]:
-    """Build Gemini Live configuration with CAG system prompt."""
-    system_instruction = (
-        SYSTEM_PROMPT
+def _system_instruction() -> str:
+    """System prompt plus the welcome-line instruction (built with each cached live config)."""
+    return (
+        get_system_prompt()
         + "\n\nStart every new session with this welcome line: "
         + WELCOME_MESSAGE
     )
 
+
+# Only voice_name and use_client_vad vary, so each combination is built once
+# and the same dict is shared by every session that uses it (callers must not
+# mutate it). The prompt fingerprint is part of the key so a rebuilt prompt
+# (prompts.invalidate_system_prompt) gets fresh configs.
+@lru_cache(maxsize=8)
+def _build_live_config(
+    voice_name: Optional[str], use_client_vad: bool, prompt_fingerprint: str
+) -> dict[str, Any]:
+    """Build Gemini Live configuration with CAG system prompt."""
     realtime_input_config: dict[str, Any] = {}
     if use_client_vad:
         realtime_input_config["automatic_activity_detection"] = {"disabled": True}
@@ -277,7 +301,7 @@ def _build_live_config(voice_name: Optional[str], use_client_vad: bool) -> dict[
 
     config: dict[str, Any] = {
         "response_modalities": ["AUDIO"],
-        "system_instruction": system_instruction,
+        "system_instruction": _system_instruction(),
         "input_audio_transcription": {},
         "output_audio_transcription": {},
         "realtime_input_config": realtime_input_config,
@@ -295,17 +319,22 @@ def _build_live_config(voice_name: Optional[str], use_client_vad: bool) -> dict[
 
 def _coerce_args(raw_args: Any) -> dict[str, Any]:
     """Convert tool arguments to dict."""
+    # Exact-type checks for the common cases; subclasses and proto-style
+    # objects fall through to the slower checks below
+    arg_type = type(raw_args)
+    if arg_type is dict:
+        return raw_args
     if raw_args is None:
         return {}
+    if arg_type is str:
+        try:
+            return orjson.loads(raw_args)
+        except orjson.JSONDecodeError:
+            return {}
     if isinstance(raw_args, dict):
         return raw_args
     if hasattr(raw_args, "to_dict"):
         return raw_args.to_dict()
-    if isinstance(raw_args, str):
-        try:
-            return json.loads(raw_args)
-        except json.JSONDecodeError:
-            return {}
     return {}
 
 
@@ -333,6 +362,15 @@ READ_ONLY_TOOLS = {
     "get_all_categories",
 }
 
+# Served entirely from the in-memory product catalog (or the session cache);
+# cheaper to run inline on the event loop than to hand off to a thread
+IN_MEMORY_TOOLS = {
+    "search_products_by_category",
+    "get_product_details",
+    "check_product_availability",
+    "get_all_categories",
+}
+
 
 async def _execute_single_tool(
     call_id: str,
@@ -350,8 +388,11 @@ async def _execute_single_tool(
     Returns: (call_id, call_name, result_string)
     """
     try:
-        # Run sync handler in thread pool to not block event loop
-        result = await asyncio.to_thread(handler, **args)
+        if call_name in IN_MEMORY_TOOLS:
+            result = handler(**args)
+        else:
+            # Run sync handler in thread pool to not block event loop
+            result = await asyncio.to_thread(handler, **args)
 
         logger.info(f"[CONCURRENT] Tool {call_name} completed: {str(result)[:100]}...")
         return (call_id, call_name, result)
@@ -362,88 +403,81 @@ async def _execute_single_tool(
 
 
 async def _execute_tools_concurrently(
-    function_calls: list,
+    calls: list[tuple[str, str, dict[str, Any]]],
     tool_handlers: dict[str, Any],
     logger: logging.Logger,
-) -> list[types.FunctionResponse]:
+) -> AsyncIterator[types.FunctionResponse]:
     """
-    Execute multiple tool calls concurrently using asyncio.gather.
+    Execute multiple tool calls concurrently, yielding each response as it finishes.
 
     Strategy:
-    - All tools run in parallel in thread pool
+    - IN_MEMORY_TOOLS run inline; the rest run in parallel in the thread pool
     - Database handles concurrency through SQLite's built-in locking
+    - A slow tool no longer holds back the responses of faster ones
 
-    Returns: List of FunctionResponse objects ready to send back to Gemini
-    """
-    if not function_calls:
-        return []
+    calls holds (call_id, call_name, args) with args already coerced to a dict.
 
+    Yields: FunctionResponse objects ready to send back to Gemini
+    """
     tasks = []
-    unknown_responses = []
 
-    for call in function_calls:
-        args = _coerce_args(call.args)
-        handler = tool_handlers.get(call.name)
+    for call_id, call_name, args in calls:
+        handler = tool_handlers.get(call_name)
 
         if handler is None:
-            logger.warning(f"[CONCURRENT] Unknown tool call: {call.name}")
-            unknown_responses.append(
-                types.FunctionResponse(
-                    id=call.id,
-                    name=call.name,
-                    response={"result": f"Unknown tool: {call.name}"},
-                )
+            logger.warning(f"[CONCURRENT] Unknown tool call: {call_name}")
+            yield types.FunctionResponse(
+                id=call_id,
+                name=call_name,
+                response={"result": f"Unknown tool: {call_name}"},
             )
             continue
 
-        logger.info(f"[CONCURRENT] Queuing tool: {call.name} with args: {args}")
+        logger.info(f"[CONCURRENT] Queuing tool: {call_name} with args: {args}")
 
         task = _execute_single_tool(
-            call_id=call.id,
-            call_name=call.name,
+            call_id=call_id,
+            call_name=call_name,
             args=args,
             handler=handler,
             logger=logger,
         )
         tasks.append(task)
 
-    # Execute all valid tool calls concurrently
+    # Execute all valid tool calls concurrently, in completion order
     if tasks:
         logger.info(f"[CONCURRENT] Executing {len(tasks)} tool(s) concurrently...")
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        function_responses = []
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"[CONCURRENT] Task raised exception: {result}")
+        completed = 0
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                call_id, call_name, result_str = await next_done
+            except Exception as exc:
+                logger.error(f"[CONCURRENT] Task raised exception: {exc}")
                 continue
 
-            call_id, call_name, result_str = result
-            function_responses.append(
-                types.FunctionResponse(
-                    id=call_id,
-                    name=call_name,
-                    response={"result": result_str},
-                )
+            completed += 1
+            yield types.FunctionResponse(
+                id=call_id,
+                name=call_name,
+                response={"result": result_str},
             )
 
-        logger.info(f"[CONCURRENT] All {len(function_responses)} tool(s) completed")
-        return unknown_responses + function_responses
-
-    return unknown_responses
+        logger.info(f"[CONCURRENT] All {completed} tool(s) completed")
 
 
 async def _send_json(websocket: WebSocket, payload: dict[str, Any]) -> None:
     """Send JSON payload to websocket."""
-    await websocket.send_text(json.dumps(payload))
+    # Text frame, not binary: the client treats binary frames as audio
+    await websocket.send_text(orjson.dumps(payload).decode())
 
 
-def _new_diag_state() -> dict[str, Any]:
+def _new_diag_state(loop: asyncio.AbstractEventLoop) -> dict[str, Any]:
     """Initialize diagnostic state for session."""
-    now = asyncio.get_event_loop().time()
+    now = loop.time()
     return {
         "start_time": now,
         "last_client_audio": None,
+        "last_client_activity": now,
         "last_gemini_response": None,
         "last_gemini_audio": None,
         "tool_inflight": False,
@@ -467,9 +501,10 @@ async def _filler_loop(
     websocket: WebSocket, state: dict[str, Any], logger: logging.Logger
 ) -> None:
     """Send short hums while tools are running."""
+    loop = asyncio.get_running_loop()
     try:
         while state.get("tool_inflight"):
-            now = asyncio.get_event_loop().time()
+            now = loop.time()
             last_audio = state.get("last_gemini_audio")
             if last_audio is not None and now - last_audio < FILLER_AUDIO_GUARD_S:
                 await asyncio.sleep(0.1)
@@ -482,7 +517,7 @@ async def _filler_loop(
             if state.get("filler_count", 0) >= FILLER_MAX_PER_TURN:
                 await asyncio.sleep(0.1)
                 continue
-            clip = random.choice(FILLER_CLIPS)
+            clip = next(_filler_clip_cycle)
             try:
                 await websocket.send_bytes(clip)
                 state["last_filler_sent"] = now
@@ -544,53 +579,53 @@ async def api_get_order(order_id: str) -> JSONResponse:
     return JSONResponse(order)
 
 
+def _int_limit(tool: Callable[..., str]) -> Callable[..., str]:
+    """Wrap a tool so a `limit` sent as a JSON float or string arrives as an int."""
+
+    @wraps(tool)
+    def call(*args: Any, **kwargs: Any) -> str:
+        limit = kwargs.get("limit")
+        if limit is not None and type(limit) is not int:
+            kwargs["limit"] = int(limit)
+        return tool(*args, **kwargs)
+
+    return call
+
+
+# Tools that take the session's SessionManager as their `session` keyword
+_SESSION_TOOLS: dict[str, Callable[..., str]] = {
+    # Product search tools
+    "search_products_by_name": _int_limit(agent_tools.search_products_by_name),
+    "search_products_by_category": _int_limit(agent_tools.search_products_by_category),
+    "get_product_details": agent_tools.get_product_details,
+    "check_product_availability": agent_tools.check_product_availability,
+    "get_product_faqs": agent_tools.get_product_faqs,
+    # Order tracking tools
+    "track_order": agent_tools.track_order,
+    "get_customer_orders": _int_limit(agent_tools.get_customer_orders),
+    "get_order_details": agent_tools.get_order_details,
+    # Order management tools
+    "cancel_order": agent_tools.cancel_order,
+    "initiate_return": agent_tools.initiate_return,
+}
+
+_STATELESS_TOOLS: dict[str, Callable[..., str]] = {
+    # FAQ search tool
+    "search_faqs": _int_limit(agent_tools.search_faqs),
+    # Utility tool
+    "get_all_categories": agent_tools.get_all_categories,
+}
+
+
 def _build_tool_handlers(session: SessionManager) -> dict[str, Any]:
     """
     Build tool handlers - CAG version with e-commerce customer support tools.
 
     Note: Policy tools are removed since policies are embedded in prompt.
     """
-    return {
-        # Product search tools
-        "search_products_by_name": lambda query, limit=5: agent_tools.search_products_by_name(
-            query, int(limit), session
-        ),
-        "search_products_by_category": lambda category, price_min=None, price_max=None, query=None, limit=10: agent_tools.search_products_by_category(
-            category, price_min, price_max, query, int(limit), session
-        ),
-        "get_product_details": lambda product_id: agent_tools.get_product_details(
-            product_id, session
-        ),
-        "check_product_availability": lambda product_id: agent_tools.check_product_availability(
-            product_id
-        ),
-        "get_product_faqs": lambda product_id: agent_tools.get_product_faqs(
-            product_id
-        ),
-        # Order tracking tools
-        "track_order": lambda order_id: agent_tools.track_order(
-            order_id, session
-        ),
-        "get_customer_orders": lambda customer_id, limit=5: agent_tools.get_customer_orders(
-            customer_id, int(limit), session
-        ),
-        "get_order_details": lambda order_id: agent_tools.get_order_details(
-            order_id, session
-        ),
-        # Order management tools
-        "cancel_order": lambda order_id, reason: agent_tools.cancel_order(
-            order_id, reason, session
-        ),
-        "initiate_return": lambda order_id, product_id, reason: agent_tools.initiate_return(
-            order_id, product_id, reason, session
-        ),
-        # FAQ search tool
-        "search_faqs": lambda query, limit=5: agent_tools.search_faqs(
-            query, int(limit)
-        ),
-        # Utility tool
-        "get_all_categories": lambda: agent_tools.get_all_categories(),
-    }
+    handlers = {name: partial(tool, session=session) for name, tool in _SESSION_TOOLS.items()}
+    handlers.update(_STATELESS_TOOLS)
+    return handlers
 
 
 async def _forward_client_audio(
@@ -601,32 +636,19 @@ async def _forward_client_audio(
     state: dict[str, Any],
 ) -> None:
     """Forward audio from client to Gemini."""
-    last_activity_time = asyncio.get_event_loop().time()
+    loop = asyncio.get_running_loop()
 
     while True:
-        try:
-            message = await asyncio.wait_for(websocket.receive(), timeout=10.0)
-        except asyncio.TimeoutError:
-            current_time = asyncio.get_event_loop().time()
-            if current_time - last_activity_time > 30.0:
-                try:
-                    silence = bytes(1600)
-                    await session.send_realtime_input(
-                        audio=types.Blob(data=silence, mime_type=INPUT_AUDIO_MIME)
-                    )
-                    last_activity_time = current_time
-                except Exception as exc:
-                    logger.error(f"Keepalive failed: {exc}")
-            continue
+        message = await websocket.receive()
 
         if message.get("type") == "websocket.disconnect":
             raise WebSocketDisconnect
 
         audio_bytes = message.get("bytes")
         if audio_bytes:
-            current_time = asyncio.get_event_loop().time()
+            current_time = loop.time()
             state["last_client_audio"] = current_time
-            last_activity_time = current_time
+            state["last_client_activity"] = current_time
 
             try:
                 await session.send_realtime_input(
@@ -641,11 +663,11 @@ async def _forward_client_audio(
         if not text_data:
             continue
 
-        last_activity_time = asyncio.get_event_loop().time()
+        state["last_client_activity"] = loop.time()
 
         try:
-            payload = json.loads(text_data)
-        except json.JSONDecodeError:
+            payload = orjson.loads(text_data)
+        except orjson.JSONDecodeError:
             continue
 
         if payload.get("type") == "text":
@@ -658,6 +680,123 @@ async def _forward_client_audio(
                 )
 
 
+async def _audio_writer(
+    websocket: WebSocket, audio_queue: asyncio.Queue, logger: logging.Logger
+) -> None:
+    """
+    Send queued Gemini audio, coalescing chunks that are already waiting.
+
+    A failed send is re-raised so the receive loop can see the writer is gone
+    and end the session instead of queueing audio nobody will drain.
+    """
+    while True:
+        chunks = [await audio_queue.get()]
+        size = len(chunks[0])
+        while size < AUDIO_BATCH_MAX_BYTES:
+            try:
+                chunk = audio_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        try:
+            await websocket.send_bytes(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+        except Exception as exc:
+            logger.error(f"[AUDIO] Failed to send audio to client: {exc}")
+            raise
+
+
+class _TranscriptBatcher:
+    """
+    Coalesce one role's streamed transcript fragments into fewer frames.
+
+    Fragments arriving within TRANSCRIPT_FLUSH_DELAY_S go out together as a
+    `final: False` delta; finish() closes the turn with one `final: True`
+    frame carrying the whole text.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        role: str,
+        loop: asyncio.AbstractEventLoop,
+        logger: logging.Logger,
+    ) -> None:
+        self._websocket = websocket
+        self._role = role
+        self._loop = loop
+        self._logger = logger
+        self._pending: list[str] = []
+        self._sent: list[str] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, text: str) -> None:
+        self._pending.append(text)
+        if self._timer is None and self._flush_task is None:
+            self._timer = self._loop.call_later(TRANSCRIPT_FLUSH_DELAY_S, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        self._flush_task = self._loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                text = "".join(self._pending)
+                self._pending.clear()
+                self._sent.append(text)
+                await self._send(text, final=False)
+        finally:
+            self._flush_task = None
+
+    async def _send(self, text: str, final: bool) -> None:
+        try:
+            await _send_json(
+                self._websocket,
+                {"type": "transcript", "role": self._role, "text": text, "final": final},
+            )
+        except Exception as exc:
+            self._logger.error(f"[TRANSCRIPT] Failed to send {self._role} transcript: {exc}")
+
+    async def finish(self) -> None:
+        """Send the turn's full text as a final frame, after any delta in flight."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            await self._flush_task
+        text = "".join(self._sent) + "".join(self._pending)
+        self._sent.clear()
+        self._pending.clear()
+        if text:
+            self._logger.info(f"{self._role.capitalize()} said: {text}")
+            await self._send(text, final=True)
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+
+
+async def _client_keepalive(
+    session: Any, state: dict[str, Any], logger: logging.Logger
+) -> None:
+    """Send Gemini a short silence whenever the client has been idle for CLIENT_KEEPALIVE_IDLE_S."""
+    loop = asyncio.get_running_loop()
+    while True:
+        idle = loop.time() - state["last_client_activity"]
+        if idle < CLIENT_KEEPALIVE_IDLE_S:
+            await asyncio.sleep(CLIENT_KEEPALIVE_IDLE_S - idle)
+            continue
+        try:
+            await session.send_realtime_input(audio=_KEEPALIVE_SILENCE)
+        except Exception as exc:
+            logger.error(f"Keepalive failed: {exc}")
+        state["last_client_activity"] = loop.time()
+
+
 async def _forward_gemini_responses(
     websocket: WebSocket,
     session: Any,
@@ -670,90 +809,99 @@ async def _forward_gemini_responses(
 
     CONCURRENT TOOL EXECUTION: When Gemini sends multiple tool calls,
     they are executed concurrently using asyncio.gather for better performance.
+
+    Audio chunks go through a queue to a writer task that batches whatever has
+    piled up into one websocket frame; transcript fragments are coalesced per
+    role and finalized when the turn completes.
     """
+    loop = asyncio.get_running_loop()
     last_event_debug: dict[str, Any] | None = None
-    while True:
-        try:
-            async for response in session.receive():
-                now = asyncio.get_event_loop().time()
-                state["last_gemini_response"] = now
-
-                last_event_debug = {
-                    "has_data": response.data is not None,
-                    "has_tool_call": bool(response.tool_call),
-                    "has_server_content": bool(response.server_content),
-                }
-
-                if response.data is not None:
-                    state["last_gemini_audio"] = now
-                    await websocket.send_bytes(response.data)
-
-                if response.server_content:
-                    input_tx = response.server_content.input_transcription
-                    if input_tx and input_tx.text:
-                        logger.info(f"User said: {input_tx.text}")
-                        await _send_json(
-                            websocket,
-                            {
-                                "type": "transcript",
-                                "role": "user",
-                                "text": input_tx.text,
-                                "final": True,
-                            },
-                        )
-
-                    output_tx = response.server_content.output_transcription
-                    if output_tx and output_tx.text:
-                        logger.info(f"Assistant said: {output_tx.text}")
-                        await _send_json(
-                            websocket,
-                            {
-                                "type": "transcript",
-                                "role": "assistant",
-                                "text": output_tx.text,
-                                "final": True,
-                            },
-                        )
-
-                if response.tool_call:
-                    num_calls = len(response.tool_call.function_calls)
-                    logger.info(
-                        "[Gemini] Tool calls incoming (%d call%s - CONCURRENT): %s",
-                        num_calls,
-                        "s" if num_calls > 1 else "",
-                        [
-                            {"id": call.id, "name": call.name, "args": _coerce_args(call.args)}
+    audio_queue: asyncio.Queue = asyncio.Queue()
+    writer_task = asyncio.create_task(_audio_writer(websocket, audio_queue, logger))
+    transcripts = {
+        role: _TranscriptBatcher(websocket, role, loop, logger) for role in ("user", "assistant")
+    }
+    try:
+        while True:
+            try:
+                async for response in session.receive():
+                    now = loop.time()
+                    state["last_gemini_response"] = now
+
+                    last_event_debug = {
+                        "has_data": response.data is not None,
+                        "has_tool_call": bool(response.tool_call),
+                        "has_server_content": bool(response.server_content),
+                    }
+
+                    if response.data is not None:
+                        state["last_gemini_audio"] = now
+                        if writer_task.done():
+                            # Surfaces the writer's send error and ends the loop
+                            writer_task.result()
+                        audio_queue.put_nowait(response.data)
+
+                    server_content = response.server_content
+                    if server_content:
+                        for role, tx in (
+                            ("user", server_content.input_transcription),
+                            ("assistant", server_content.output_transcription),
+                        ):
+                            if tx and tx.text:
+                                transcripts[role].add(tx.text)
+                            if tx and tx.finished:
+                                await transcripts[role].finish()
+
+                        if server_content.turn_complete or server_content.interrupted:
+                            for batcher in transcripts.values():
+                                await batcher.finish()
+
+                    if response.tool_call:
+                        # Coerce arguments once, for both the log line and execution
+                        calls = [
+                            (call.id, call.name, _coerce_args(call.args))
                             for call in response.tool_call.function_calls
-                        ],
-                    )
-                    state["tool_inflight"] = True
-                    state["filler_count"] = 0
-                    state["last_filler_sent"] = None
-                    _maybe_start_filler_task(websocket, state, logger)
-
-                    # CONCURRENT EXECUTION: Execute all tool calls in parallel
-                    function_responses = await _execute_tools_concurrently(
-                        function_calls=response.tool_call.function_calls,
-                        tool_handlers=tool_handlers,
-                        logger=logger,
-                    )
-
-                    if function_responses:
-                        try:
+                        ]
+                        if logger.isEnabledFor(logging.INFO):
                             logger.info(
-                                "[CONCURRENT] Sending %s function response(s): %s",
-                                len(function_responses),
+                                "[Gemini] Tool calls incoming (%d call%s - CONCURRENT): %s",
+                                len(calls),
+                                "s" if len(calls) > 1 else "",
                                 [
+                                    {"id": call_id, "name": call_name, "args": args}
+                                    for call_id, call_name, args in calls
+                                ],
+                            )
+                        state["tool_inflight"] = True
+                        state["filler_count"] = 0
+                        state["last_filler_sent"] = None
+                        _maybe_start_filler_task(websocket, state, logger)
+
+                        # CONCURRENT EXECUTION: Execute all tool calls in parallel and
+                        # send each response as soon as its tool finishes
+                        function_responses = _execute_tools_concurrently(
+                            calls=calls,
+                            tool_handlers=tool_handlers,
+                            logger=logger,
+                        )
+                        delivered = 0
+                        try:
+                            async for fr in function_responses:
+                                logger.info(
+                                    "[CONCURRENT] Sending function response: %s",
                                     {
                                         "id": fr.id,
                                         "name": fr.name,
                                         "result_preview": str(fr.response)[:200],
-                                    }
-                                    for fr in function_responses
-                                ],
-                            )
-                            await session.send_tool_response(function_responses=function_responses)
-                            logger.info("[CONCURRENT] Function responses delivered successfully")
+                                    },
+                                )
+                                await session.send_tool_response(function_responses=[fr])
+                                delivered += 1
+                            if delivered:
+                                logger.info(
+                                    "[CONCURRENT] %s function response(s) delivered successfully",
+                                    delivered,
+                                )
                         except Exception as exc:
                             logger.exception(
                                 "[CONCURRENT] Failed to send function responses to Gemini (model=%s): %s",
@@ -761,17 +909,20 @@ async def _forward_gemini_responses(
                                 exc,
                             )
                         finally:
+                            await function_responses.aclose()
                             state["tool_inflight"] = False
-                    else:
-                        state["tool_inflight"] = False
 
-        except Exception as exc:
-            logger.error(
-                "[GEMINI] Error in receive loop: %s | last_event=%s",
-                exc,
-                last_event_debug,
-            )
-            break
+            except Exception as exc:
+                logger.error(
+                    "[GEMINI] Error in receive loop: %s | last_event=%s",
+                    exc,
+                    last_event_debug,
+                )
+                break
+    finally:
+        writer_task.cancel()
+        for batcher in transcripts.values():
+            batcher.close()
 
 
 @app.websocket("/session")
@@ -792,15 +943,18 @@ async def handle_session(websocket: WebSocket) -> None:
     voice = os.getenv("GEMINI_LIVE_VOICE", GEMINI_DEFAULT_VOICE)
     use_client_vad = _env_flag("GEMINI_LIVE_USE_CLIENT_VAD", default=False)
 
+    prompt_fingerprint = get_prompt_fingerprint()
+
     logger.info(
-        "CAG Architecture - Tools: %s (policies embedded in prompt) | model=%s voice=%s client_vad=%s",
+        "CAG Architecture - Tools: %s (policies embedded in prompt) | model=%s voice=%s client_vad=%s prompt=%s",
         len(tool_handlers),
         model,
         voice,
         use_client_vad,
+        prompt_fingerprint,
     )
 
-    state = _new_diag_state()
+    state = _new_diag_state(asyncio.get_running_loop())
 
     # Get API key from environment
     api_key = os.getenv("GEMINI_API_KEY")
@@ -810,7 +964,7 @@ async def handle_session(websocket: WebSocket) -> None:
         return
 
     client = genai.Client(api_key=api_key)
-    config = _build_live_config(voice, use_client_vad)
+    config = _build_live_config(voice, use_client_vad, prompt_fingerprint)
 
     try:
         async with client.aio.live.connect(model=model, config=config) as live_session:
@@ -831,6 +985,7 @@ async def handle_session(websocket: WebSocket) -> None:
                     websocket, live_session, tool_handlers, logger, state
                 )
             )
+            keepalive_task = asyncio.create_task(_client_keepalive(live_session, state, logger))
 
             done, pending = await asyncio.wait(
                 {send_task, receive_task},
@@ -839,6 +994,7 @@ async def handle_session(websocket: WebSocket) -> None:
 
             for task in pending:
                 task.cancel()
+            keepalive_task.cancel()
 
             filler_task = state.get("filler_task")
             if filler_task and not filler_task.done():
@@ -3,14 +3,139 @@ FAQ Manager - Handle FAQ operations
 """
 import sqlite3
 import logging
-from typing import List, Dict, Any
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from foodjoint_agent.db.db_utils import get_connection
-from foodjoint_agent.utils.fuzzy_search import fuzzy_match
+from foodjoint_agent.utils.fuzzy_search import fuzzy_match_indices
 
 logger = logging.getLogger(__name__)
 
+# Answers longer than this come back as an FTS snippet around the match
+FAQ_ANSWER_MAX_CHARS = 200
+
+# Snippet length in tokens (FTS5 caps this at 64; trigram tokens ~ characters)
+FAQ_SNIPPET_TOKENS = 64
+
+# The trigram tokenizer cannot match terms shorter than this
+FTS_MIN_TERM_LEN = 3
+
+# Fuzzy fallback scores at most this many FTS candidates per requested result
+FUZZY_CANDIDATES_PER_RESULT = 10
+
+# Question words and fillers that appear in nearly every FAQ; OR-ing them into
+# the keyword query would match everything and never reach the fuzzy fallback
+FAQ_STOPWORDS = frozenset({
+    "about", "and", "any", "are", "can", "could", "does", "for", "from", "get",
+    "has", "have", "how", "its", "not", "should", "tell", "that", "the", "there",
+    "this", "use", "was", "what", "when", "where", "which", "who", "why", "will",
+    "with", "would", "you", "your",
+})
+
+_SQL_PRODUCT_FAQS = """
+    SELECT question, answer
+    FROM product_faqs
+    WHERE product_id = ?
+"""
+# product_faqs carries a trigger-maintained copy of product_name
+_SQL_PRODUCT_FAQS_WITH_NAME = """
+    SELECT question, answer, product_name
+    FROM product_faqs
+    WHERE product_id = ?
+"""
+_SQL_ALL_FAQS = """
+    SELECT id, product_id, product_name, question, answer
+    FROM product_faqs
+"""
+_SQL_SEARCH_FAQS = f"""
+    SELECT f.product_id, f.product_name, f.question,
+           CASE WHEN length(f.answer) <= ? THEN f.answer
+                ELSE snippet(faqs_fts, 1, '', '', '…', {FAQ_SNIPPET_TOKENS})
+           END AS answer,
+           bm25(faqs_fts) AS rank
+    FROM faqs_fts
+    JOIN product_faqs f ON f.id = faqs_fts.rowid
+    WHERE faqs_fts MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+
+_SQL_FAQ_CANDIDATES = """
+    SELECT rowid FROM faqs_fts
+    WHERE faqs_fts MATCH ?
+    ORDER BY bm25(faqs_fts)
+    LIMIT ?
+"""
+
+def _query_terms(query: str) -> List[str]:
+    """Query words long enough for the trigram index, minus FAQ_STOPWORDS"""
+    return [
+        t for t in re.findall(r"\w+", query.lower())
+        if len(t) >= FTS_MIN_TERM_LEN and t not in FAQ_STOPWORDS
+    ]
+
+def _fts_any_terms(query: str) -> str:
+    """FTS5 expression matching any significant query word"""
+    return " OR ".join(f'"{t}"' for t in sorted(set(_query_terms(query))))
+
+def _fts_any_trigrams(query: str) -> str:
+    """FTS5 expression matching any 3-character piece of any significant query word (typo tolerant)"""
+    trigrams = {
+        term[i:i + FTS_MIN_TERM_LEN]
+        for term in _query_terms(query)
+        for i in range(len(term) - FTS_MIN_TERM_LEN + 1)
+    }
+    return " OR ".join(f'"{t}"' for t in sorted(trigrams))
+
+def _plain_cursor() -> sqlite3.Cursor:
+    """Cursor returning plain tuples; see _rows_as_dicts"""
+    cursor = get_connection().cursor()
+    cursor.row_factory = None
+    return cursor
+
+def _rows_as_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Zip each remaining tuple row with the column names, read once per query"""
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+def _bm25_relevance(rank: float) -> float:
+    """Map an FTS5 bm25 rank (negative, lower is better) onto 0-1 like the fuzzy scores"""
+    strength = max(-rank, 0.0)
+    return strength / (1.0 + strength)
+
+def _truncate_answer(answer: str) -> str:
+    """Cap an answer at FAQ_ANSWER_MAX_CHARS"""
+    if len(answer) <= FAQ_ANSWER_MAX_CHARS:
+        return answer
+    return answer[:FAQ_ANSWER_MAX_CHARS].rstrip() + "…"
+
 class FAQManager:
-    """Manage FAQ operations"""
+    """
+    Manage FAQ operations
+
+    The corpus used for fuzzy fallback search is read once on first use; call
+    invalidate_corpus() (or get_faq_manager.cache_clear()) after changing FAQs.
+    """
+
+    def __init__(self):
+        # (case-folded searchable texts, FAQ rows, FAQ id -> index) for fuzzy
+        # fallback, loaded lazily
+        self._corpus: Optional[Tuple[List[str], List[Dict[str, Any]], Dict[int, int]]] = None
+
+    def _load_corpus(self) -> Tuple[List[str], List[Dict[str, Any]], Dict[int, int]]:
+        """Read every FAQ with its product name and build the fuzzy-search corpus"""
+        cursor = _plain_cursor()
+        cursor.execute(_SQL_ALL_FAQS)
+
+        faq_rows = _rows_as_dicts(cursor)
+        positions = {row.pop("id"): index for index, row in enumerate(faq_rows)}
+        # Normalized once here; rapidfuzz scorers don't case-fold on their own
+        faq_texts = [f"{row['question']} {row['answer']}".casefold() for row in faq_rows]
+        return faq_texts, faq_rows, positions
+
+    def invalidate_corpus(self) -> None:
+        """Drop the cached FAQ corpus so the next fuzzy search reloads it"""
+        self._corpus = None
 
     def get_product_faqs(self, product_id: str) -> List[Dict[str, Any]]:
         """
@@ -22,64 +147,93 @@ class FAQManager:
         Returns:
             List of FAQ dictionaries
         """
-        conn = get_connection()
-        cursor = conn.cursor()
+        cursor = _plain_cursor()
 
         try:
-            cursor.execute("""
-                SELECT question, answer
-                FROM product_faqs
-                WHERE product_id = ?
-            """, (product_id,))
+            cursor.execute(_SQL_PRODUCT_FAQS, (product_id,))
 
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return _rows_as_dicts(cursor)
 
         except Exception as e:
             logger.error(f"Error getting product FAQs: {e}")
             return []
-        finally:
-            conn.close()
 
-    def search_all_faqs(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def get_product_faqs_with_name(self, product_id: str) -> List[Dict[str, Any]]:
         """
-        Search across all FAQs
+        Get all FAQs for a product along with the product name, in one query
 
         Args:
-            query: Search query
-            limit: Maximum number of results
+            product_id: Product ID
 
         Returns:
-            List of FAQ dictionaries with product info
+            List of FAQ dictionaries (question, answer, product_name)
         """
-        conn = get_connection()
-        cursor = conn.cursor()
+        cursor = _plain_cursor()
 
         try:
-            # Get all FAQs with product names
-            cursor.execute("""
-                SELECT pf.product_id, p.product_name, pf.question, pf.answer
-                FROM product_faqs pf
-                JOIN products p ON pf.product_id = p.product_id
-            """)
+            cursor.execute(_SQL_PRODUCT_FAQS_WITH_NAME, (product_id,))
+
+            return _rows_as_dicts(cursor)
+
+        except Exception as e:
+            logger.error(f"Error getting product FAQs: {e}")
+            return []
 
-            all_faqs = cursor.fetchall()
+    def search_all_faqs(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Search across all FAQs
 
-            # Create searchable text for each FAQ
-            faq_texts = []
-            faq_map = {}
+        Args:
+            query: Search query
+            limit: Maximum number of results
 
-            for idx, row in enumerate(all_faqs):
-                faq_text = f"{row['question']} {row['answer']}"
-                faq_texts.append(faq_text)
-                faq_map[faq_text] = dict(row)
+        Returns:
+            List of FAQ dictionaries with product info; long answers are
+            shortened to a snippet
+        """
+        cursor = _plain_cursor()
 
-            # Fuzzy match
-            matches = fuzzy_match(query, faq_texts, threshold=0.5, limit=limit)
+        try:
+            # Ranked keyword hits from the FTS index, with bounded answers
+            match_expr = _fts_any_terms(query)
+            if match_expr:
+                cursor.execute(_SQL_SEARCH_FAQS, (FAQ_ANSWER_MAX_CHARS, match_expr, limit))
+                results = _rows_as_dicts(cursor)
+
+                if results:
+                    for faq in results:
+                        faq["relevance_score"] = _bm25_relevance(faq.pop("rank"))
+                    return results
+
+            # Nothing matched by keyword: fall back to fuzzy matching
+            if self._corpus is None:
+                self._corpus = self._load_corpus()
+            faq_texts, faq_rows, positions = self._corpus
+            norm_query = query.casefold().strip()
+
+            # Score only FAQs sharing a trigram with the query, unless none do
+            candidates = []
+            trigram_expr = _fts_any_trigrams(query)
+            if trigram_expr:
+                cursor.execute(
+                    _SQL_FAQ_CANDIDATES, (trigram_expr, limit * FUZZY_CANDIDATES_PER_RESULT)
+                )
+                candidates = [positions[rowid] for (rowid,) in cursor if rowid in positions]
+
+            if candidates:
+                matches = [
+                    (candidates[i], score)
+                    for i, score in fuzzy_match_indices(
+                        norm_query, [faq_texts[c] for c in candidates], threshold=0.5, limit=limit
+                    )
+                ]
+            else:
+                matches = fuzzy_match_indices(norm_query, faq_texts, threshold=0.5, limit=limit)
 
             results = []
-            for faq_text, score in matches:
-                faq = faq_map[faq_text].copy()
+            for index, score in matches:
+                faq = faq_rows[index].copy()
+                faq["answer"] = _truncate_answer(faq["answer"])
                 faq["relevance_score"] = score
                 results.append(faq)
 
@@ -88,9 +242,8 @@ class FAQManager:
         except Exception as e:
             logger.error(f"Error searching FAQs: {e}")
             return []
-        finally:
-            conn.close()
 
+@lru_cache(maxsize=1)
 def get_faq_manager() -> FAQManager:
-    """Get FAQManager instance"""
+    """Get singleton FAQManager instance"""
     return FAQManager()
@@ -1,15 +1,69 @@
 """
 Order Manager - Handle order operations
 """
-import sqlite3
 import logging
-from typing import List, Dict, Optional, Any
-from datetime import datetime
+from typing import List, Dict, Mapping, Optional, Any
+from datetime import datetime, timezone
 from foodjoint_agent.db.db_utils import get_connection
-from foodjoint_agent.utils.validators import is_within_return_window, can_cancel_order, can_return_order
+from foodjoint_agent.utils.validators import CANCELLABLE_STATUSES, RETURNABLE_STATUSES, is_within_return_window
 
 logger = logging.getLogger(__name__)
 
+# Date columns are stored as epoch seconds; tool responses show ISO dates
+_DATE_FIELDS = ("order_date", "delivery_date")
+
+def _to_iso_date(value: Any) -> Any:
+    """Convert an epoch-seconds date to YYYY-MM-DD (other values pass through)"""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%d")
+    return value
+
+def _order_from_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert an orders row to a dict with ISO date strings"""
+    order = dict(row)
+    for field in _DATE_FIELDS:
+        order[field] = _to_iso_date(order.get(field))
+    return order
+
+_SQL_ORDER = "SELECT * FROM orders WHERE order_id = ?"
+_SQL_ORDER_ITEMS = "SELECT * FROM order_items WHERE order_id = ?"
+# Recent orders first, then each one's items, in a single statement; an
+# order without items yields one row with NULL item columns
+_SQL_CUSTOMER_ORDERS_WITH_ITEMS = """
+    WITH recent AS (
+        SELECT * FROM orders
+        WHERE customer_id = ?
+        ORDER BY order_date DESC
+        LIMIT ?
+    )
+    SELECT r.*, i.*
+    FROM recent r
+    LEFT JOIN order_items i ON i.order_id = r.order_id
+    ORDER BY r.order_date DESC, r.order_id, i.id
+"""
+# The status check and the update happen in the same statement; statuses
+# are bound after the order ID
+_CANCELLABLE = tuple(sorted(CANCELLABLE_STATUSES))
+_SQL_CANCEL_ORDER = f"""
+    UPDATE orders SET order_status = 'Cancelled'
+    WHERE order_id = ? AND order_status IN ({", ".join("?" * len(_CANCELLABLE))})
+"""
+_CANCELLABLE_TEXT = ", ".join(f"'{status}'" for status in _CANCELLABLE)
+_SQL_ORDER_STATUS = "SELECT order_status FROM orders WHERE order_id = ?"
+# Everything initiate_return checks, in one row; product columns are NULL
+# when the product isn't in the catalog
+_SQL_RETURN_CHECK = """
+    SELECT o.order_status, o.order_date,
+           EXISTS (
+               SELECT 1 FROM order_items i
+               WHERE i.order_id = o.order_id AND i.product_id = ?
+           ) AS in_order,
+           p.product_name, p.return_eligible
+    FROM orders o
+    LEFT JOIN products p ON p.product_id = ?
+    WHERE o.order_id = ?
+"""
+
 class OrderManager:
     """Manage order operations"""
 
@@ -28,29 +82,23 @@ class OrderManager:
 
         try:
             # Get order
-            cursor.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,))
+            cursor.execute(_SQL_ORDER, (order_id,))
             order_row = cursor.fetchone()
 
             if not order_row:
                 return None
 
-            order = dict(order_row)
+            order = _order_from_row(order_row)
 
             # Get order items
-            cursor.execute("""
-                SELECT * FROM order_items WHERE order_id = ?
-            """, (order_id,))
-            items_rows = cursor.fetchall()
-
-            order["items"] = [dict(row) for row in items_rows]
+            cursor.execute(_SQL_ORDER_ITEMS, (order_id,))
+            order["items"] = [dict(row) for row in cursor.fetchall()]
 
             return order
 
         except Exception as e:
             logger.error(f"Error getting order: {e}")
             return None
-        finally:
-            conn.close()
 
     def get_customer_orders(self, customer_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -65,37 +113,33 @@ class OrderManager:
         """
         conn = get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None
 
         try:
-            cursor.execute("""
-                SELECT * FROM orders
-                WHERE customer_id = ?
-                ORDER BY order_date DESC
-                LIMIT ?
-            """, (customer_id, limit))
-
-            rows = cursor.fetchall()
-            orders = []
-
-            for row in rows:
-                order = dict(row)
-
-                # Get items for each order
-                cursor.execute("""
-                    SELECT * FROM order_items WHERE order_id = ?
-                """, (order["order_id"],))
-                items_rows = cursor.fetchall()
-                order["items"] = [dict(item_row) for item_row in items_rows]
-
-                orders.append(order)
-
-            return orders
+            cursor.execute(_SQL_CUSTOMER_ORDERS_WITH_ITEMS, (customer_id, limit))
+
+            # Columns are orders.* followed by order_items.*; split them by position
+            columns = [d[0] for d in cursor.description]
+            split = columns.index("id")
+            order_columns, item_columns = columns[:split], columns[split:]
+            order_id_pos = order_columns.index("order_id")
+
+            orders: Dict[str, Dict[str, Any]] = {}
+            for row in cursor:
+                order_id = row[order_id_pos]
+                order = orders.get(order_id)
+                if order is None:
+                    order = _order_from_row(dict(zip(order_columns, row[:split])))
+                    order["items"] = []
+                    orders[order_id] = order
+                if row[split] is not None:
+                    order["items"].append(dict(zip(item_columns, row[split:])))
+
+            return list(orders.values())
 
         except Exception as e:
             logger.error(f"Error getting customer orders: {e}")
             return []
-        finally:
-            conn.close()
 
     def cancel_order(self, order_id: str, reason: str) -> Dict[str, Any]:
         """
@@ -108,48 +152,40 @@ class OrderManager:
         Returns:
             Result dictionary
         """
-        order = self.get_order(order_id)
-
-        if not order:
-            return {
-                "success": False,
-                "message": f"Order {order_id} not found. Please verify the Order ID."
-            }
-
-        # Check if order can be cancelled
-        if not can_cancel_order(order["order_status"]):
-            return {
-                "success": False,
-                "message": f"Order {order_id} cannot be cancelled because it has status '{order['order_status']}'. Only orders with status 'Placed' can be cancelled. You can initiate a return once the order is delivered."
-            }
-
-        # Update order status
         conn = get_connection()
         cursor = conn.cursor()
 
         try:
-            cursor.execute("""
-                UPDATE orders
-                SET order_status = 'Cancelled'
-                WHERE order_id = ?
-            """, (order_id,))
+            cursor.execute(_SQL_CANCEL_ORDER, (order_id, *_CANCELLABLE))
 
-            conn.commit()
+            if cursor.rowcount == 1:
+                return {
+                    "success": True,
+                    "message": f"Order {order_id} has been successfully cancelled. Reason: {reason}"
+                }
+
+            # Nothing updated: either the order doesn't exist or its status
+            # doesn't allow cancelling
+            cursor.execute(_SQL_ORDER_STATUS, (order_id,))
+            row = cursor.fetchone()
+
+            if not row:
+                return {
+                    "success": False,
+                    "message": f"Order {order_id} not found. Please verify the Order ID."
+                }
 
             return {
-                "success": True,
-                "message": f"Order {order_id} has been successfully cancelled. Reason: {reason}"
+                "success": False,
+                "message": f"Order {order_id} cannot be cancelled because it has status '{row['order_status']}'. Only orders with status {_CANCELLABLE_TEXT} can be cancelled. You can initiate a return once the order is delivered."
             }
 
         except Exception as e:
-            conn.rollback()
             logger.error(f"Error cancelling order: {e}")
             return {
                 "success": False,
                 "message": f"Failed to cancel order due to a system error. Please try again."
             }
-        finally:
-            conn.close()
 
     def initiate_return(self, order_id: str, product_id: str, reason: str) -> Dict[str, Any]:
         """
@@ -163,63 +199,60 @@ class OrderManager:
         Returns:
             Result dictionary
         """
-        order = self.get_order(order_id)
-
-        if not order:
-            return {
-                "success": False,
-                "message": f"Order {order_id} not found. Please verify the Order ID."
-            }
+        conn = get_connection()
+        cursor = conn.cursor()
 
-        # Check order status
-        if order["order_status"] != "Delivered":
-            return {
-                "success": False,
-                "message": f"Returns can only be initiated for delivered orders. Your order status is '{order['order_status']}'."
-            }
+        try:
+            cursor.execute(_SQL_RETURN_CHECK, (product_id, product_id, order_id))
+            row = cursor.fetchone()
 
-        # Check return window (30 days)
-        if not is_within_return_window(order["order_date"], days=30):
-            return {
-                "success": False,
-                "message": f"Return window has expired. Returns must be initiated within 30 days of delivery. Your order was placed on {order['order_date']}."
-            }
+            if not row:
+                return {
+                    "success": False,
+                    "message": f"Order {order_id} not found. Please verify the Order ID."
+                }
 
-        # Check if product is in order
-        product_in_order = any(item["product_id"] == product_id for item in order["items"])
+            order_status = row["order_status"]
+            order_date = _to_iso_date(row["order_date"])
 
-        if not product_in_order:
-            return {
-                "success": False,
-                "message": f"Product {product_id} was not found in order {order_id}."
-            }
+            # Check order status
+            if order_status not in RETURNABLE_STATUSES:
+                return {
+                    "success": False,
+                    "message": f"Returns can only be initiated for delivered orders. Your order status is '{order_status}'."
+                }
 
-        # Get product details to check return eligibility
-        conn = get_connection()
-        cursor = conn.cursor()
+            # Check return window (30 days)
+            if not is_within_return_window(order_date, days=30):
+                return {
+                    "success": False,
+                    "message": f"Return window has expired. Returns must be initiated within 30 days of delivery. Your order was placed on {order_date}."
+                }
 
-        try:
-            cursor.execute("SELECT return_eligible, product_name FROM products WHERE product_id = ?", (product_id,))
-            product_row = cursor.fetchone()
+            # Check if product is in order
+            if not row["in_order"]:
+                return {
+                    "success": False,
+                    "message": f"Product {product_id} was not found in order {order_id}."
+                }
 
-            if not product_row:
+            # Check return eligibility
+            if row["product_name"] is None:
                 return {
                     "success": False,
                     "message": f"Product {product_id} not found in catalog."
                 }
 
-            product = dict(product_row)
-
-            if not product["return_eligible"]:
+            if not row["return_eligible"]:
                 return {
                     "success": False,
-                    "message": f"{product['product_name']} is not eligible for return due to hygiene and safety reasons (personal care, consumables, or digital downloads)."
+                    "message": f"{row['product_name']} is not eligible for return due to hygiene and safety reasons (personal care, consumables, or digital downloads)."
                 }
 
             # Return is eligible
             return {
                 "success": True,
-                "message": f"Return initiated for {product['product_name']} from order {order_id}. Reason: {reason}. You will receive a return authorization email with shipping instructions. Refund will be processed within 7-10 business days after the item passes inspection."
+                "message": f"Return initiated for {row['product_name']} from order {order_id}. Reason: {reason}. You will receive a return authorization email with shipping instructions. Refund will be processed within 7-10 business days after the item passes inspection."
             }
 
         except Exception as e:
@@ -228,8 +261,6 @@ class OrderManager:
                 "success": False,
                 "message": "Failed to initiate return due to a system error. Please try again."
             }
-        finally:
-            conn.close()
 
 def get_order_manager() -> OrderManager:
     """Get OrderManager instance"""
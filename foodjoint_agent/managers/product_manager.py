@@ -1,17 +1,150 @@
 """
 Product Manager - Handle product catalog operations
 """
-import sqlite3
 import logging
-from typing import List, Dict, Optional, Any
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import List, Dict, Optional, Any, Set, Tuple
 from functools import lru_cache
+
+import numpy as np
+
 from foodjoint_agent.db.db_utils import get_connection
-from foodjoint_agent.utils.fuzzy_search import fuzzy_match, get_best_match
+from foodjoint_agent.utils.fuzzy_search import fuzzy_match_keys
 
 logger = logging.getLogger(__name__)
 
+# Fraction of the query's bigrams a product name must share to be scored
+BIGRAM_MIN_OVERLAP = 0.3
+
+# Queries that are a product ID rather than a name (P1001, p1001)
+PRODUCT_ID_PATTERN = re.compile(r"^[Pp]\d+$")
+
+# The trigram tokenizer cannot match anything shorter than this
+FTS_MIN_QUERY_LEN = 3
+
+# SQL is kept as module constants so every call hands sqlite3 the same
+# text and hits its compiled-statement cache
+_SQL_ALL_PRODUCTS = "SELECT * FROM products"
+# Name column only: a hit here is scored as a perfect match, which a word
+# in the description isn't
+_SQL_FTS_NAME = """
+    SELECT p.product_id FROM products p
+    JOIN products_fts f ON p.rowid = f.rowid
+    WHERE products_fts MATCH 'product_name : ' || ?
+    ORDER BY bm25(products_fts, 10.0, 1.0)
+    LIMIT ?
+"""
+
+def _bigrams(text: str) -> Set[str]:
+    """Character bigrams of an already-normalized string"""
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _format_price_rating(price: Optional[float], rating: Optional[float]) -> Tuple[str, str]:
+    """Display strings for a product's price and rating"""
+    price_str = f"${price:.2f}" if price is not None else "N/A"
+    rating_str = f"{rating:.1f}" if rating is not None else "N/A"
+    return price_str, rating_str
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as a single FTS5 phrase (substring match under trigram)"""
+    return '"' + text.replace('"', '""') + '"'
+
 class ProductManager:
-    """Manage product catalog operations"""
+    """
+    Manage product catalog operations
+
+    The products table is read once into memory and searches are served from
+    there; SQLite stays authoritative (and serves the FTS lookups). Call
+    get_product_manager.cache_clear() after changing the catalog.
+    """
+
+    def __init__(self):
+        # Product dicts in load order, plus product_id -> position
+        self._products: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        # Normalized names and bigram -> product_id postings
+        self._norm_names: Dict[str, str] = {}
+        self._bigram_index: Dict[str, Set[str]] = {}
+        # Exact-name lookup and (normalized name, product_id) pairs sorted for prefix search
+        self._exact_names: Dict[str, List[str]] = {}
+        self._sorted_names: List[Tuple[str, str]] = []
+        self._load_catalog()
+
+    def _load_catalog(self):
+        """Load all products into memory and build the name indexes and filter columns"""
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute(_SQL_ALL_PRODUCTS)
+            for row in cursor:
+                product = dict(row)
+                product["_price_str"], product["_rating_str"] = _format_price_rating(
+                    product["price"], product["rating"]
+                )
+                product_id = product["product_id"]
+                norm = product["product_name"].lower().strip()
+
+                self._positions[product_id] = len(self._products)
+                self._products.append(product)
+                self._norm_names[product_id] = norm
+                self._exact_names.setdefault(norm, []).append(product_id)
+                for bigram in _bigrams(norm):
+                    self._bigram_index.setdefault(bigram, set()).add(product_id)
+
+        except Exception as e:
+            logger.error(f"Error loading product catalog: {e}")
+
+        self._sorted_names = sorted((norm, product_id) for product_id, norm in self._norm_names.items())
+
+        # Structure-of-arrays columns for vectorized category/price filtering;
+        # missing ratings and review counts sort last like NULLs in SQL
+        products = self._products
+        self._categories = np.array([p["category"] for p in products], dtype=object)
+        self._prices = np.array([p["price"] for p in products], dtype=np.float64)
+        self._ratings = np.array(
+            [p["rating"] if p["rating"] is not None else -np.inf for p in products], dtype=np.float64
+        )
+        self._review_counts = np.array(
+            [p["review_count"] if p["review_count"] is not None else -1 for p in products], dtype=np.int64
+        )
+        self._norm_name_list = [p["product_name"].lower().strip() for p in products]
+
+    def _copy_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of a cached product dict (callers may annotate it)"""
+        position = self._positions.get(product_id)
+        return dict(self._products[position]) if position is not None else None
+
+    def _prefix_matches(self, prefix: str, limit: int) -> List[str]:
+        """Product IDs whose normalized name starts with prefix, alphabetically"""
+        matches = []
+        start = bisect_left(self._sorted_names, (prefix,))
+        for norm, product_id in self._sorted_names[start:]:
+            if not norm.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(product_id)
+        return matches
+
+    def _name_candidates(self, query: str) -> Dict[str, str]:
+        """Products sharing enough bigrams with the query (product_id -> name)"""
+        query_bigrams = _bigrams(query)
+        if not query_bigrams:
+            return self._norm_names
+
+        hits = Counter()
+        for bigram in query_bigrams:
+            hits.update(self._bigram_index.get(bigram, ()))
+
+        # Sorted so fuzzy-score ties resolve the same way on every run
+        min_hits = math.ceil(BIGRAM_MIN_OVERLAP * len(query_bigrams))
+        return {
+            product_id: self._norm_names[product_id]
+            for product_id, count in sorted(hits.items())
+            if count >= min_hits
+        }
 
     def search_by_name(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
@@ -24,91 +157,106 @@ class ProductManager:
         Returns:
             List of product dictionaries
         """
-        conn = get_connection()
-        cursor = conn.cursor()
+        norm_query = query.lower().strip()
+        if not norm_query:
+            return []
 
-        try:
-            # Get all product names for fuzzy matching
-            cursor.execute("SELECT product_id, product_name FROM products")
-            all_products = cursor.fetchall()
+        results = []
+        seen = set()
+
+        def collect(product_ids, score=1.0):
+            for product_id in product_ids:
+                if product_id in seen or len(results) >= limit:
+                    continue
+                product = self._copy_product(product_id)
+                if product:
+                    seen.add(product_id)
+                    product["match_score"] = score
+                    results.append(product)
 
-            product_map = {row["product_name"]: row["product_id"] for row in all_products}
-            product_names = list(product_map.keys())
+        # Fast path: a spoken product ID, then exact and prefix name matches
+        if PRODUCT_ID_PATTERN.match(query.strip()):
+            collect([query.strip().upper()])
 
-            # Fuzzy match
-            matches = fuzzy_match(query, product_names, threshold=0.6, limit=limit)
+        collect(self._exact_names.get(norm_query, ()))
+        collect(self._prefix_matches(norm_query, limit))
 
-            if not matches:
-                return []
+        if len(results) >= limit:
+            return results
 
-            # Get full product details for matches
-            results = []
-            for product_name, score in matches:
-                product_id = product_map[product_name]
-                cursor.execute("SELECT * FROM products WHERE product_id = ?", (product_id,))
-                row = cursor.fetchone()
+        # Substring hits straight from the trigram FTS index
+        if len(norm_query) >= FTS_MIN_QUERY_LEN:
+            conn = get_connection()
+            cursor = conn.cursor()
 
-                if row:
-                    product = dict(row)
-                    product["match_score"] = score
-                    results.append(product)
+            try:
+                cursor.execute(_SQL_FTS_NAME, (_fts_phrase(norm_query), limit))
+                collect(row["product_id"] for row in cursor)
+
+            except Exception as e:
+                logger.error(f"Error searching products by name: {e}")
 
+        if len(results) >= limit:
             return results
 
-        except Exception as e:
-            logger.error(f"Error searching products by name: {e}")
-            return []
-        finally:
-            conn.close()
+        # Fill the rest with fuzzy matches, scoring only the candidates
+        # surfaced by the bigram index
+        candidates = {
+            product_id: name
+            for product_id, name in self._name_candidates(norm_query).items()
+            if product_id not in seen
+        }
+        matches = fuzzy_match_keys(
+            norm_query, candidates, threshold=0.6, limit=limit - len(results)
+        )
+
+        for product_id, score in matches:
+            collect([product_id], score)
+
+        return results
 
     def search_by_category(
         self,
         category: str,
         price_min: Optional[float] = None,
         price_max: Optional[float] = None,
-        limit: int = 10
+        limit: int = 10,
+        query: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search products by category with optional price range
+        Search products by category with optional price range and name filter
 
         Args:
             category: Product category
             price_min: Minimum price (optional)
             price_max: Maximum price (optional)
             limit: Maximum number of results
+            query: Substring the product name must contain (optional)
 
         Returns:
-            List of product dictionaries
+            List of product dictionaries, best rated first
         """
-        conn = get_connection()
-        cursor = conn.cursor()
+        mask = self._categories == category
 
-        try:
-            # Build query
-            query = "SELECT * FROM products WHERE category = ?"
-            params = [category]
-
-            if price_min is not None:
-                query += " AND price >= ?"
-                params.append(price_min)
+        if price_min is not None:
+            mask &= self._prices >= price_min
 
-            if price_max is not None:
-                query += " AND price <= ?"
-                params.append(price_max)
+        if price_max is not None:
+            mask &= self._prices <= price_max
 
-            query += " ORDER BY rating DESC, review_count DESC LIMIT ?"
-            params.append(limit)
+        positions = np.flatnonzero(mask)
 
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
+        name_query = query.lower().strip() if query else ""
+        if name_query:
+            positions = positions[
+                np.array([name_query in self._norm_name_list[i] for i in positions], dtype=bool)
+            ]
 
-            return [dict(row) for row in rows]
+        # Rating, then review count, both descending; lexsort is stable so
+        # remaining ties keep catalog order
+        order = np.lexsort((-self._review_counts[positions], -self._ratings[positions]))
 
-        except Exception as e:
-            logger.error(f"Error searching products by category: {e}")
-            return []
-        finally:
-            conn.close()
+        return [dict(self._products[i]) for i in positions[order[:limit]]]
 
     def get_product_details(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -120,20 +268,7 @@ class ProductManager:
         Returns:
             Product dictionary or None
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute("SELECT * FROM products WHERE product_id = ?", (product_id,))
-            row = cursor.fetchone()
-
-            return dict(row) if row else None
-
-        except Exception as e:
-            logger.error(f"Error getting product details: {e}")
-            return None
-        finally:
-            conn.close()
+        return self._copy_product(product_id)
 
     def check_availability(self, product_id: str) -> Dict[str, Any]:
         """
@@ -161,19 +296,7 @@ class ProductManager:
 
     def get_all_categories(self) -> List[str]:
         """Get list of all product categories"""
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute("SELECT DISTINCT category FROM products ORDER BY category")
-            rows = cursor.fetchall()
-            return [row["category"] for row in rows]
-
-        except Exception as e:
-            logger.error(f"Error getting categories: {e}")
-            return []
-        finally:
-            conn.close()
+        return sorted(set(self._categories))
 
 @lru_cache(maxsize=1)
 def get_product_manager() -> ProductManager:
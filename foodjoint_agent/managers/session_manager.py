@@ -1,12 +1,19 @@
 """
 Session Manager - Handle conversation context per session
 """
+import itertools
 import logging
-from typing import List, Dict, Optional, Any
-from collections import deque
+from typing import List, Dict, Optional, Any, Callable, Iterable, Tuple
+from collections import deque, OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of formatted tool results remembered per session
+TOOL_CACHE_SIZE = 128
+
+# Number of recently viewed order IDs remembered per session
+RECENT_ORDER_LOOKUPS = 3
+
 class SessionManager:
     """Manage session context and conversation history"""
 
@@ -15,9 +22,14 @@ class SessionManager:
         self.customer_id: Optional[str] = None
         self.conversation_history: deque = deque(maxlen=max_context_size)
         self.recent_product_searches: deque = deque(maxlen=5)
-        self.recent_order_lookups: deque = deque(maxlen=3)
+        # Order IDs in least- to most-recently viewed order (values unused)
+        self.recent_order_lookups: "OrderedDict[str, None]" = OrderedDict()
         self.current_intent: Optional[str] = None
         self.context: Dict[str, Any] = {}
+        # (tool_name, *args) -> (formatted result, session tracking to replay on a hit)
+        self.tool_cache: "OrderedDict[Tuple, Tuple[str, Optional[Callable[[], None]]]]" = OrderedDict()
+        # Formatted get_context_summary(), rebuilt after the context changes
+        self._summary_cache: Optional[str] = None
 
     def add_conversation_turn(self, role: str, text: str):
         """Add a conversation turn to history"""
@@ -32,40 +44,109 @@ class SessionManager:
             "product_id": product_id,
             "product_name": product_name
         })
+        self._summary_cache = None
+
+    def extend_product_searches(self, pairs: Iterable[Tuple[str, str]]):
+        """Track several product searches at once from (product_id, product_name) pairs"""
+        self.recent_product_searches.extend(
+            {"product_id": product_id, "product_name": product_name}
+            for product_id, product_name in pairs
+        )
+        self._summary_cache = None
 
     def add_order_lookup(self, order_id: str):
-        """Track an order lookup"""
-        if order_id not in [o for o in self.recent_order_lookups]:
-            self.recent_order_lookups.append(order_id)
+        """Track an order lookup, moving an already tracked one to the most recent end"""
+        if order_id == self.get_last_order():
+            return
+        self.recent_order_lookups.pop(order_id, None)
+        self.recent_order_lookups[order_id] = None
+        self._trim_order_lookups()
+        self._summary_cache = None
+
+    def extend_order_lookups(self, order_ids: Iterable[str]):
+        """Track several order lookups at once, in order (already tracked ones move to the recent end)"""
+        changed = False
+        for order_id in order_ids:
+            if order_id in self.recent_order_lookups:
+                self.recent_order_lookups.move_to_end(order_id)
+            else:
+                self.recent_order_lookups[order_id] = None
+            changed = True
+        if changed:
+            self._trim_order_lookups()
+            self._summary_cache = None
+
+    def _trim_order_lookups(self):
+        """Forget the least recently viewed orders beyond RECENT_ORDER_LOOKUPS"""
+        while len(self.recent_order_lookups) > RECENT_ORDER_LOOKUPS:
+            self.recent_order_lookups.popitem(last=False)
 
     def set_customer_id(self, customer_id: str):
         """Set identified customer ID"""
         self.customer_id = customer_id
+        self._summary_cache = None
         logger.info(f"Session {self.session_id}: Identified customer {customer_id}")
 
     def set_intent(self, intent: str):
         """Set current user intent"""
         self.current_intent = intent
 
+    def get_tool_result(self, key: Tuple) -> Optional[str]:
+        """Get a cached tool result keyed by (tool_name, *args), replaying its session tracking"""
+        entry = self.tool_cache.get(key)
+        if entry is None:
+            return None
+        self.tool_cache.move_to_end(key)
+        result, on_hit = entry
+        if on_hit is not None:
+            on_hit()
+        return result
+
+    def cache_tool_result(self, key: Tuple, result: str, on_hit: Optional[Callable[[], None]] = None):
+        """
+        Remember a tool result, evicting the least recently used entry
+
+        on_hit re-applies the tool's session tracking (e.g. the order lookup)
+        whenever the result is served from the cache.
+        """
+        self.tool_cache[key] = (result, on_hit)
+        self.tool_cache.move_to_end(key)
+        if len(self.tool_cache) > TOOL_CACHE_SIZE:
+            self.tool_cache.popitem(last=False)
+
+    def invalidate_tool_results(self, *ids: str, tools: Iterable[str] = ()):
+        """Drop cached results that mention any of the IDs or come from the given tools"""
+        tools = set(tools)
+        stale = [
+            key for key in self.tool_cache
+            if key[0] in tools or any(i in key[1:] for i in ids)
+        ]
+        for key in stale:
+            del self.tool_cache[key]
+
     def get_context_summary(self) -> str:
-        """Get formatted context summary"""
+        """Get formatted context summary (cached until the context changes)"""
+        if self._summary_cache is not None:
+            return self._summary_cache
+
         parts = []
 
         if self.customer_id:
             parts.append(f"Customer ID: {self.customer_id}")
 
         if self.recent_order_lookups:
-            parts.append(f"Recent orders viewed: {', '.join(list(self.recent_order_lookups))}")
+            parts.append(f"Recent orders viewed: {', '.join(self.recent_order_lookups)}")
 
         if self.recent_product_searches:
-            products = [p["product_name"] for p in list(self.recent_product_searches)]
-            parts.append(f"Recent products viewed: {', '.join(products[:3])}")
+            products = [p["product_name"] for p in itertools.islice(self.recent_product_searches, 3)]
+            parts.append(f"Recent products viewed: {', '.join(products)}")
 
-        return " | ".join(parts) if parts else "No context yet"
+        self._summary_cache = " | ".join(parts) if parts else "No context yet"
+        return self._summary_cache
 
     def get_last_order(self) -> Optional[str]:
         """Get most recently looked up order"""
-        return self.recent_order_lookups[-1] if self.recent_order_lookups else None
+        return next(reversed(self.recent_order_lookups), None)
 
     def get_last_product(self) -> Optional[Dict[str, str]]:
         """Get most recently searched product"""
@@ -78,4 +159,6 @@ class SessionManager:
         self.recent_order_lookups.clear()
         self.current_intent = None
         self.context.clear()
+        self.tool_cache.clear()
+        self._summary_cache = None
         logger.info(f"Session {self.session_id}: Context cleared")
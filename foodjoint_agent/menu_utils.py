@@ -7,12 +7,16 @@ This module only provides validation when adding items to the cart.
 """
 from __future__ import annotations
 
-import json
-from functools import lru_cache
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from rapidfuzz import fuzz
+import orjson
+from rapidfuzz import fuzz, process
+
+
+# Distinct normalized names whose lookup result is remembered
+RESOLVE_CACHE_SIZE = 512
 
 
 def _default_menu_path() -> Path:
@@ -31,14 +35,17 @@ class MenuManager:
         self.menu_path = menu_path or _default_menu_path()
         self.menu_data: List[Dict] = []
         self._name_to_item: Dict[str, Dict] = {}
+        self._names_list: List[str] = []
+        # Normalized name -> resolved item (or None); the menu is immutable once loaded
+        self._resolve_cache: Dict[str, Optional[Dict]] = {}
         self._load_menu()
         self._build_indexes()
 
     def _load_menu(self) -> None:
         if not self.menu_path.exists():
             raise FileNotFoundError(f"Menu file not found at {self.menu_path}")
-        with self.menu_path.open("r", encoding="utf-8") as f:
-            self.menu_data = json.load(f)
+        self.menu_data = orjson.loads(self.menu_path.read_bytes())
+        self._resolve_cache.clear()
 
     def _build_indexes(self) -> None:
         """Build a name-to-item lookup for fast validation."""
@@ -46,10 +53,7 @@ class MenuManager:
             name_lower = item["name"].lower().strip()
             if name_lower not in self._name_to_item:
                 self._name_to_item[name_lower] = item
-
-    @staticmethod
-    def _similarity_score(first: str, second: str) -> float:
-        return fuzz.ratio(first, second) / 100.0
+        self._names_list = list(self._name_to_item)
 
     def check_item_exists(self, item_name: str) -> Optional[Dict]:
         """
@@ -59,26 +63,32 @@ class MenuManager:
         This is the primary method used by the cart to validate items.
         """
         target = item_name.lower().strip()
-
+        try:
+            return self._resolve_cache[target]
+        except KeyError:
+            pass
+
+        item = self._resolve(target)
+        if len(self._resolve_cache) >= RESOLVE_CACHE_SIZE:
+            # Evict the oldest entry
+            del self._resolve_cache[next(iter(self._resolve_cache))]
+        self._resolve_cache[target] = item
+        return item
+
+    def _resolve(self, target: str) -> Optional[Dict]:
+        """Tiered lookup of an already-normalized name."""
         # Tier 1: Exact match (case-insensitive)
         if target in self._name_to_item:
             return self._name_to_item[target]
 
         # Tier 2: Substring match
-        for name_lower, item in self._name_to_item.items():
+        for name_lower in self._names_list:
             if target in name_lower or name_lower in target:
-                return item
-
-        # Tier 3: Fuzzy match with high threshold (0.75)
-        best_match = None
-        best_score = 0.0
-        for name_lower, item in self._name_to_item.items():
-            score = self._similarity_score(target, name_lower)
-            if score > best_score and score >= 0.75:
-                best_score = score
-                best_match = item
+                return self._name_to_item[name_lower]
 
-        return best_match
+        # Tier 3: Fuzzy match with high threshold (0.75); ties go to the first name
+        match = process.extractOne(target, self._names_list, scorer=fuzz.ratio, score_cutoff=75)
+        return self._name_to_item[match[0]] if match else None
 
     def get_item_price(self, item_name: str) -> Optional[float]:
         """Get the price of an item by name."""
@@ -90,7 +100,21 @@ class MenuManager:
         return self.check_item_exists(item_name)
 
 
-@lru_cache(maxsize=1)
+_default_menu_manager: Optional[MenuManager] = None
+_default_menu_lock = threading.Lock()
+
+
 def get_menu_manager(menu_path: Optional[Path] = None) -> MenuManager:
-    """Get a cached menu manager instance."""
-    return MenuManager(menu_path)
+    """
+    Get the shared menu manager for the default menu.
+
+    An explicit menu_path gets its own, uncached instance.
+    """
+    global _default_menu_manager
+    if menu_path is not None:
+        return MenuManager(menu_path)
+    if _default_menu_manager is None:
+        with _default_menu_lock:
+            if _default_menu_manager is None:
+                _default_menu_manager = MenuManager()
+    return _default_menu_manager
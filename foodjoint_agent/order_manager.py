@@ -10,25 +10,46 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import re
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple
 
 from .menu_utils import MenuManager, get_menu_manager
 
 logger = logging.getLogger(__name__)
 
 
+def _cents(price: float) -> int:
+    """Price in whole cents, so running totals don't accumulate float drift."""
+    return round(price * 100)
+
+
+def _addons_key(addons: List[str]) -> Tuple[str, ...]:
+    """Order-independent form of an addons list, for matching cart entries."""
+    return tuple(sorted(addons))
+
+
 class OrderManager:
     """
     Stores the caller's in-progress cart.
 
     Thread-safe for concurrent async tool execution via asyncio.Lock.
+
+    Mutations publish an immutable snapshot (items, total, count) when they
+    finish; the read methods use only that snapshot, so they need no lock and
+    always see a consistent cart, never one that is half-way through an edit.
     """
 
     def __init__(self, menu_manager: Optional[MenuManager] = None) -> None:
         self.menu_manager = menu_manager or get_menu_manager()
         self.cart: List[Dict] = []
+        # Lower-cased item name -> cart entries with that name, in cart order
+        self._cart_index: Dict[str, List[Dict]] = {}
+        # (lower-cased name, addons key) -> first cart entry with that name and addons
+        self._cart_by_addons: Dict[Tuple[str, Tuple[str, ...]], Dict] = {}
+        # Running totals, kept in step with every cart mutation
+        self._total_cents = 0
+        self._count = 0
+        self._snapshot: Tuple[Tuple[Dict, ...], int, int] = ((), 0, 0)
         self._lock = asyncio.Lock()  # Lock for concurrent access
         logger.info("Started a new order cart (with async lock)")
 
@@ -44,10 +65,11 @@ class OrderManager:
             return {"success": False, "message": f"'{item_name}' is not on our menu."}
 
         addons = addons or []
-        existing_item = self._find_item_in_cart(menu_item["name"], addons)
+        addons_key = _addons_key(addons)
+        existing_item = self._find_item_in_cart(menu_item["name"], addons_key)
 
         if existing_item:
-            existing_item["quantity"] += quantity
+            self._adjust_quantity(existing_item, existing_item["quantity"] + quantity)
             return {
                 "success": True,
                 "message": f"Updated {menu_item['name']} quantity to {existing_item['quantity']}",
@@ -61,6 +83,11 @@ class OrderManager:
             "addons": addons,
         }
         self.cart.append(cart_item)
+        self._total_cents += _cents(cart_item["item_price"]) * quantity
+        self._count += quantity
+        self._cart_index.setdefault(menu_item["name"].lower(), []).append(cart_item)
+        self._cart_by_addons[(menu_item["name"].lower(), addons_key)] = cart_item
+        self._publish()
         return {
             "success": True,
             "message": f"Added {quantity}x {menu_item['name']} to your order",
@@ -72,18 +99,20 @@ class OrderManager:
         logger.info("Removing %s", item_name)
         item_lower = item_name.lower()
 
-        for idx, item in enumerate(self.cart):
-            if item["item_name"].lower() == item_lower:
-                removed = self.cart.pop(idx)
-                return {
-                    "success": True,
-                    "message": f"Removed {removed['item_name']} from your order",
-                }
+        same_name = self._cart_index.get(item_lower)
+        if same_name:
+            removed = same_name[0]
+            self._remove_from_cart(removed)
+            return {
+                "success": True,
+                "message": f"Removed {removed['item_name']} from your order",
+            }
 
         # Try fuzzy match
-        for idx, item in enumerate(self.cart):
+        for item in self.cart:
             if item_lower in item["item_name"].lower() or item["item_name"].lower() in item_lower:
-                removed = self.cart.pop(idx)
+                removed = item
+                self._remove_from_cart(removed)
                 return {
                     "success": True,
                     "message": f"Removed {removed['item_name']} from your order",
@@ -99,18 +128,19 @@ class OrderManager:
             return self.remove_item(item_name)
 
         item_lower = item_name.lower()
-        for item in self.cart:
-            if item["item_name"].lower() == item_lower:
-                item["quantity"] = new_quantity
-                return {
-                    "success": True,
-                    "message": f"Updated {item['item_name']} quantity to {new_quantity}",
-                }
+        same_name = self._cart_index.get(item_lower)
+        if same_name:
+            item = same_name[0]
+            self._adjust_quantity(item, new_quantity)
+            return {
+                "success": True,
+                "message": f"Updated {item['item_name']} quantity to {new_quantity}",
+            }
 
         # Try fuzzy match
         for item in self.cart:
             if item_lower in item["item_name"].lower() or item["item_name"].lower() in item_lower:
-                item["quantity"] = new_quantity
+                self._adjust_quantity(item, new_quantity)
                 return {
                     "success": True,
                     "message": f"Updated {item['item_name']} quantity to {new_quantity}",
@@ -123,18 +153,23 @@ class OrderManager:
         logger.info("Updating %s addons to %s", item_name, new_addons)
         item_lower = item_name.lower()
 
-        for item in self.cart:
-            if item["item_name"].lower() == item_lower:
-                existing = item.get("addons", [])
-                for addon in new_addons:
-                    if addon not in existing:
-                        existing.append(addon)
-                item["addons"] = existing
-                addons_str = ", ".join(existing) if existing else "no addons"
-                return {
-                    "success": True,
-                    "message": f"Updated {item['item_name']} with addons: {addons_str}",
-                }
+        same_name = self._cart_index.get(item_lower)
+        if same_name:
+            item = same_name[0]
+            existing = item.get("addons", [])
+            old_key = _addons_key(existing)
+            for addon in new_addons:
+                if addon not in existing:
+                    existing.append(addon)
+            item["addons"] = existing
+            self._reindex_addons(item_lower, old_key)
+            self._reindex_addons(item_lower, _addons_key(existing))
+            self._publish()
+            addons_str = ", ".join(existing) if existing else "no addons"
+            return {
+                "success": True,
+                "message": f"Updated {item['item_name']} with addons: {addons_str}",
+            }
 
         return {
             "success": False,
@@ -143,25 +178,26 @@ class OrderManager:
 
     def get_cart_items(self) -> List[Dict]:
         """Get a copy of all cart items."""
-        return self.cart.copy()
+        return list(self._snapshot[0])
 
     def get_item_count(self) -> int:
         """Get total item count in cart."""
-        return sum(item["quantity"] for item in self.cart)
+        return self._snapshot[2]
 
     def calculate_total(self) -> float:
         """Calculate the total price of all items in cart."""
-        total = sum(item["item_price"] * item["quantity"] for item in self.cart)
+        total = self._snapshot[1] / 100.0
         logger.info("Cart total is %.2f", total)
         return total
 
     def get_cart_summary(self, include_prices: bool = False) -> str:
         """Get a formatted summary of the cart."""
-        if not self.cart:
+        items, total_cents, _ = self._snapshot
+        if not items:
             return "Your order is currently empty."
 
         summary_lines = ["Your current order:"]
-        for item in self.cart:
+        for item in items:
             line = f"- {item['quantity']}x {item['item_name']}"
             if item.get("addons"):
                 line += f" ({', '.join(item['addons'])})"
@@ -171,27 +207,67 @@ class OrderManager:
             summary_lines.append(line)
 
         if include_prices:
-            summary_lines.append(f"Total: ${self.calculate_total():.2f}")
+            total = total_cents / 100.0
+            logger.info("Cart total is %.2f", total)
+            summary_lines.append(f"Total: ${total:.2f}")
 
         return "\n".join(summary_lines)
 
     def clear_cart(self) -> None:
         """Clear all items from the cart."""
         logger.info("Clearing cart")
-        self.cart = []
+        self.cart.clear()
+        self._cart_index.clear()
+        self._cart_by_addons.clear()
+        self._total_cents = 0
+        self._count = 0
+        self._publish()
 
     def is_empty(self) -> bool:
         """Check if cart is empty."""
-        return len(self.cart) == 0
-
-    def _find_item_in_cart(self, item_name: str, addons: List[str]) -> Optional[Dict]:
-        """Find an item in cart with matching name and addons."""
-        for item in self.cart:
-            if item["item_name"].lower() == item_name.lower() and sorted(
-                item.get("addons", [])
-            ) == sorted(addons):
-                return item
-        return None
+        return not self._snapshot[0]
+
+    def _publish(self) -> None:
+        """Replace the read snapshot with a copy of the current cart and totals."""
+        items = tuple({**item, "addons": list(item["addons"])} for item in self.cart)
+        # A single attribute assignment, so readers get the old or the new view
+        self._snapshot = (items, self._total_cents, self._count)
+
+    def _find_item_in_cart(
+        self, item_name: str, addons_key: Tuple[str, ...]
+    ) -> Optional[Dict]:
+        """Find an item in cart with matching name and addons (see _addons_key)."""
+        return self._cart_by_addons.get((item_name.lower(), addons_key))
+
+    def _reindex_addons(self, name_lower: str, addons_key: Tuple[str, ...]) -> None:
+        """Point an addons-index key at the first cart entry that still matches it."""
+        key = (name_lower, addons_key)
+        for item in self._cart_index.get(name_lower, ()):
+            if _addons_key(item.get("addons", [])) == addons_key:
+                self._cart_by_addons[key] = item
+                return
+        self._cart_by_addons.pop(key, None)
+
+    def _adjust_quantity(self, item: Dict, new_quantity: int) -> None:
+        """Set a cart entry's quantity and move the running totals by the difference."""
+        delta = new_quantity - item["quantity"]
+        item["quantity"] = new_quantity
+        self._total_cents += _cents(item["item_price"]) * delta
+        self._count += delta
+        self._publish()
+
+    def _remove_from_cart(self, item: Dict) -> None:
+        """Drop one cart entry (by identity) from the cart, the name index and the totals."""
+        self._total_cents -= _cents(item["item_price"]) * item["quantity"]
+        self._count -= item["quantity"]
+        key = item["item_name"].lower()
+        same_name = self._cart_index[key]
+        same_name[:] = [entry for entry in same_name if entry is not item]
+        if not same_name:
+            del self._cart_index[key]
+        self._reindex_addons(key, _addons_key(item.get("addons", [])))
+        del self.cart[next(i for i, entry in enumerate(self.cart) if entry is item)]
+        self._publish()
 
     def generate_order_id(self) -> str:
         """Generate a unique order ID."""
@@ -2,7 +2,15 @@
 System Prompts for E-commerce Voice Agent
 Includes CAG (Cache-Augmented Generation) with embedded policies
 """
-from foodjoint_agent.cag_builder import build_cag_context
+import hashlib
+from functools import lru_cache
+
+from foodjoint_agent.cag_builder import (
+    build_cag_context,
+    build_categories_context,
+    build_order_status_context,
+    build_policy_context,
+)
 
 # Role definition
 ROLE_DEFINITION = """
@@ -224,7 +232,15 @@ PROACTIVE ASSISTANCE:
 =================================================================
 """
 
-SYSTEM_PROMPT = f"""
+@lru_cache(maxsize=1)
+def get_system_prompt() -> str:
+    """
+    Assemble the full system prompt on first use
+
+    The CAG context is embedded here, so the result is cached; call
+    invalidate_system_prompt() after the policy data changes.
+    """
+    return f"""
 {ROLE_DEFINITION}
 
 {build_cag_context()}
@@ -241,7 +257,40 @@ SYSTEM_PROMPT = f"""
 
 {CONTEXT_AWARENESS}
 
-Remember: You are Alex, a helpful AI customer support agent. Be natural, concise, and always use tools for data lookups. The embedded policies above are your immediate reference - no tools needed for policy questions.
+Remember: You are Priya, a helpful AI customer support agent. Be natural, concise, and always use tools for data lookups. The embedded policies above are your immediate reference - no tools needed for policy questions.
 """.strip()
 
+def invalidate_system_prompt() -> None:
+    """
+    Rebuild the system prompt and the CAG context in it on next use
+
+    The fingerprint changes with the prompt, and main keys its cached live
+    configs on it, so sessions started afterwards get the new prompt.
+    """
+    for builder in (
+        build_policy_context,
+        build_categories_context,
+        build_order_status_context,
+        build_cag_context,
+        get_system_prompt,
+        get_prompt_fingerprint,
+    ):
+        builder.cache_clear()
+
+@lru_cache(maxsize=1)
+def get_prompt_fingerprint() -> str:
+    """
+    Short stable hash of the system prompt
+
+    Identifies which prompt a session ran with (e.g. in logs or as part of
+    a cache key); changes whenever the prompt or its CAG context does.
+    """
+    return hashlib.blake2b(get_system_prompt().encode("utf-8"), digest_size=16).hexdigest()
+
+def __getattr__(name: str) -> str:
+    # SYSTEM_PROMPT stays importable but is only assembled when first read
+    if name == "SYSTEM_PROMPT":
+        return get_system_prompt()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 WELCOME_MESSAGE = "Hi! I'm Priya, your customer support assistant. How can I help you today?"
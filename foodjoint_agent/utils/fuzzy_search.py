@@ -1,8 +1,36 @@
 """
 Fuzzy search utilities using rapidfuzz
+
+Scorers run without a processor (the rapidfuzz 3 default), so callers pass
+a query and choices they have already normalized, e.g. case-folded once
+when their corpus is loaded.
 """
 from rapidfuzz import fuzz, process
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+
+def _extract(
+    query: str,
+    choices: Union[List[str], Dict[str, str]],
+    threshold: float,
+    limit: int
+) -> List[Tuple[str, float, Union[int, str]]]:
+    """
+    Run WRatio over choices and keep matches at or above threshold
+
+    Returns:
+        rapidfuzz (matched_string, score 0-100, index or key) triples, best first
+    """
+    if not query or not choices:
+        return []
+
+    # Use WRatio for best overall performance
+    return process.extract(
+        query,
+        choices,
+        scorer=fuzz.WRatio,
+        limit=limit,
+        score_cutoff=threshold * 100  # rapidfuzz uses 0-100 scale
+    )
 
 def fuzzy_match(
     query: str,
@@ -22,31 +50,59 @@ def fuzzy_match(
     Returns:
         List of tuples (matched_string, score)
     """
+    # Convert to 0-1 scale
+    return [(match, score / 100.0) for match, score, _ in _extract(query, choices, threshold, limit)]
+
+def get_best_match(
+    query: str,
+    choices: List[str],
+    threshold: float = 0.75
+) -> Optional[Tuple[str, float]]:
+    """
+    Get single best match
+
+    Returns:
+        Tuple (matched_string, score) or None if no match above threshold
+    """
     if not query or not choices:
-        return []
+        return None
 
-    # Use WRatio for best overall performance
-    results = process.extract(
+    result = process.extractOne(
         query,
         choices,
         scorer=fuzz.WRatio,
-        limit=limit,
-        score_cutoff=threshold * 100  # rapidfuzz uses 0-100 scale
+        score_cutoff=threshold * 100
     )
 
-    # Convert to 0-1 scale
-    return [(match, score / 100.0) for match, score, _ in results]
+    return (result[0], result[1] / 100.0) if result else None
 
-def get_best_match(
+def fuzzy_match_keys(
+    query: str,
+    choices: Dict[str, str],
+    threshold: float = 0.75,
+    limit: int = 5
+) -> List[Tuple[str, float]]:
+    """
+    Fuzzy match against a key -> string mapping
+
+    Unlike fuzzy_match, duplicate strings stay distinct because results
+    are reported by key.
+
+    Returns:
+        List of tuples (key, score)
+    """
+    return [(key, score / 100.0) for _, score, key in _extract(query, choices, threshold, limit)]
+
+def fuzzy_match_indices(
     query: str,
     choices: List[str],
-    threshold: float = 0.75
-) -> Optional[Tuple[str, float]]:
+    threshold: float = 0.75,
+    limit: int = 5
+) -> List[Tuple[int, float]]:
     """
-    Get single best match
+    Fuzzy match against a list, reporting positions instead of strings
 
     Returns:
-        Tuple (matched_string, score) or None if no match above threshold
+        List of tuples (index into choices, score)
     """
-    results = fuzzy_match(query, choices, threshold, limit=1)
-    return results[0] if results else None
+    return [(index, score / 100.0) for _, score, index in _extract(query, choices, threshold, limit)]
@@ -1,26 +1,38 @@
 """
 Input validation utilities
 """
-from datetime import datetime, timedelta
-from typing import Optional
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Order statuses that allow a cancellation or a return
+CANCELLABLE_STATUSES = frozenset({"Placed"})
+RETURNABLE_STATUSES = frozenset({"Delivered"})
+
+# Entity IDs: a type letter (Product, Order, Customer) and at least four digits
+_ID_PATTERN = re.compile(r"^([POC])(\d{4,})$")
+
+def _valid_id(value: str, prefix: str) -> bool:
+    """Check an ID is the prefix letter followed by at least four digits"""
+    return bool(value) and len(value) >= 5 and value[0] == prefix and value[1:].isdigit()
+
+def parse_id(value: str) -> Optional[Tuple[str, int]]:
+    """Split an ID like P1001 into its type letter and number, or None if malformed"""
+    match = _ID_PATTERN.match(value or "")
+    return (match.group(1), int(match.group(2))) if match else None
 
 def validate_product_id(product_id: str) -> bool:
     """Validate product ID format (P1001, P1002, etc.)"""
-    if not product_id:
-        return False
-    return product_id.startswith("P") and len(product_id) >= 5
+    return _valid_id(product_id, "P")
 
 def validate_order_id(order_id: str) -> bool:
     """Validate order ID format (O0001, O0002, etc.)"""
-    if not order_id:
-        return False
-    return order_id.startswith("O") and len(order_id) >= 5
+    return _valid_id(order_id, "O")
 
 def validate_customer_id(customer_id: str) -> bool:
     """Validate customer ID format (C0001, C0002, etc.)"""
-    if not customer_id:
-        return False
-    return customer_id.startswith("C") and len(customer_id) >= 5
+    return _valid_id(customer_id, "C")
 
 def validate_price_range(price_min: Optional[float], price_max: Optional[float]) -> bool:
     """Validate price range"""
@@ -32,22 +44,23 @@ def validate_price_range(price_min: Optional[float], price_max: Optional[float])
         return False
     return True
 
-def is_within_return_window(order_date: str, days: int = 30) -> bool:
-    """Check if order is within return window"""
+@lru_cache(maxsize=4096)
+def _parse_iso_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date (order dates repeat across calls)"""
+    return date.fromisoformat(value)
+
+def is_within_return_window(order_date: str, days: int = 30, *, today: Optional[date] = None) -> bool:
+    """Check if order is within return window (pass today when checking many orders)"""
     try:
-        order_datetime = datetime.strptime(order_date, "%Y-%m-%d")
-        today = datetime.now()
-        days_since_order = (today - order_datetime).days
+        days_since_order = ((today or date.today()) - _parse_iso_date(order_date)).days
         return days_since_order <= days
-    except:
+    except (TypeError, ValueError):
         return False
 
 def can_cancel_order(order_status: str) -> bool:
     """Check if order can be cancelled based on status"""
-    cancellable_statuses = ["Placed"]
-    return order_status in cancellable_statuses
+    return order_status in CANCELLABLE_STATUSES
 
 def can_return_order(order_status: str, return_eligible: bool) -> bool:
     """Check if order can be returned"""
-    returnable_statuses = ["Delivered"]
-    return order_status in returnable_statuses and return_eligible
+    return order_status in RETURNABLE_STATUSES and return_eligible